@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Candidate, Question, Result, TestConfig
+from .models import Candidate, CandidateStats, ItemAnalysisRun, Question, QuestionAnalysis, Result, TestConfig
 
 @admin.register(Candidate)
 class CandidateAdmin(admin.ModelAdmin):
@@ -7,12 +7,32 @@ class CandidateAdmin(admin.ModelAdmin):
     search_fields = ['username', 'name']
     list_filter = ['test_attempted']
 
+@admin.register(CandidateStats)
+class CandidateStatsAdmin(admin.ModelAdmin):
+    list_display = ['candidate', 'attempts', 'points_sum', 'best_points', 'last_attempt']
+    search_fields = ['candidate__username', 'candidate__name']
+    readonly_fields = ['attempts', 'points_sum', 'average_points', 'best_points', 'worst_points', 'last_points',
+                       'streak', 'recent_points', 'last_attempt']
+
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
     list_display = ['qid', 'que', 'ans']
     search_fields = ['que']
     list_filter = ['ans']
 
+@admin.register(QuestionAnalysis)
+class QuestionAnalysisAdmin(admin.ModelAdmin):
+    list_display = ['question', 'version', 'responses', 'difficulty', 'discrimination',
+                    'rate_a', 'rate_b', 'rate_c', 'rate_d', 'skip_rate', 'analyzed_at']
+    search_fields = ['question__que']
+    ordering = ['discrimination']
+    readonly_fields = list_display
+
+@admin.register(ItemAnalysisRun)
+class ItemAnalysisRunAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'results', 'responses', 'kr20', 'seconds']
+    readonly_fields = ['created_at', 'results', 'responses', 'kr20', 'kr20_by_length', 'seconds']
+
 @admin.register(Result)
 class ResultAdmin(admin.ModelAdmin):
     list_display = ['resultid', 'username', 'date', 'time', 'points', 'right', 'wrong']
@@ -0,0 +1,33 @@
+"""
+Binary encoding of the per-question answers stored in ``Result.answers``.
+
+Each question packs into 13 bytes: the qid (int64), the question version that
+was graded (uint32) and one flags byte holding the chosen option (bits 0-2,
+0 when skipped), the correct option (bits 3-5) and correctness (bit 6).
+Question text is not stored; ``Result.details`` rebuilds it on demand.
+"""
+import struct
+
+_RECORD = struct.Struct('<qIB')
+RECORD_SIZE = _RECORD.size
+_OPTIONS = ('', 'A', 'B', 'C', 'D')
+_OPTION_CODES = {opt: code for code, opt in enumerate(_OPTIONS) if opt}
+
+
+def pack_answers(items) -> bytes:
+    """Pack (qid, version, user, correct, is_correct) tuples."""
+    out = bytearray()
+    for qid, version, user, correct, is_correct in items:
+        flags = _OPTION_CODES.get(user, 0) | (_OPTION_CODES.get(correct, 0) << 3) | (bool(is_correct) << 6)
+        out += _RECORD.pack(qid, version, flags)
+    return bytes(out)
+
+
+def unpack_answers(blob) -> list:
+    """Inverse of ``pack_answers``; skipped answers come back as ''."""
+    if not blob:
+        return []
+    return [
+        (qid, version, _OPTIONS[flags & 7], _OPTIONS[(flags >> 3) & 7], bool(flags & 64))
+        for qid, version, flags in _RECORD.iter_unpack(bytes(blob))
+    ]
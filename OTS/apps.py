@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class OtsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'OTS'
+
+    def ready(self):
+        from OTS import signals  # noqa: F401
@@ -0,0 +1,72 @@
+"""
+Write-behind autosave for answers on an in-progress paper.
+
+Each change updates the attempt's answers in the default cache. The merged
+answers are written to ExamTimer.saved_answers only once
+OTS_AUTOSAVE_FLUSH_CHANGES changes have piled up, on the first change after
+OTS_AUTOSAVE_FLUSH_SECONDS without a write, or on any change in the test's
+last OTS_AUTOSAVE_FLUSH_SECONDS. Whatever is still unwritten when the attempt
+ends (submitted, abandoned or logged out) goes into the UPDATE that finishes
+its timer (OTS.exam_timer). Restoring reads the cache first and falls back
+to the database, so a browser crash loses nothing and a lost cache loses at
+most one batch.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from OTS.exam_timer import CACHE_GRACE_SECONDS
+from OTS.models import ExamTimer
+
+OPTIONS = ('A', 'B', 'C', 'D')
+
+
+def _cache_key(attempt: int) -> str:
+    return f'autosave:{attempt}'
+
+
+def _state(attempt: int) -> dict:
+    state = cache.get(_cache_key(attempt))
+    if state is None:
+        answers = ExamTimer.objects.filter(pk=attempt).values_list('saved_answers', flat=True).first()
+        state = {'answers': answers or {}, 'dirty': 0, 'flushed_at': time.time()}
+    return state
+
+
+def saved_answers(timer: dict) -> dict:
+    """Return the attempt's saved answers as {qid: option}."""
+    return {int(qid): option for qid, option in _state(timer['attempt'])['answers'].items()}
+
+
+def save_answers(timer: dict, changes: dict) -> bool:
+    """
+    Apply {qid: option} changes to the attempt; an empty option clears the
+    answer. Returns True when this call flushed to the database.
+    """
+    state = _state(timer['attempt'])
+    for qid, option in changes.items():
+        if option:
+            state['answers'][str(qid)] = option
+        else:
+            state['answers'].pop(str(qid), None)
+    state['dirty'] += len(changes)
+    now = time.time()
+    flush_seconds = getattr(settings, 'OTS_AUTOSAVE_FLUSH_SECONDS', 15)
+    flush = (state['dirty'] >= getattr(settings, 'OTS_AUTOSAVE_FLUSH_CHANGES', 10)
+             or now - state['flushed_at'] >= flush_seconds
+             or now + flush_seconds >= timer['start_ts'] + timer['duration_sec'])
+    if flush:
+        ExamTimer.objects.filter(pk=timer['attempt']).update(saved_answers=state['answers'])
+        state['dirty'] = 0
+        state['flushed_at'] = now
+    cache.set(_cache_key(timer['attempt']), state, timer['duration_sec'] + CACHE_GRACE_SECONDS)
+    return flush
+
+
+def take_unflushed(timer: dict):
+    """Drop the attempt's cached answers; returns them if some were never written, else None."""
+    key = _cache_key(timer['attempt'])
+    state = cache.get(key)
+    cache.delete(key)
+    return state['answers'] if state and state['dirty'] else None
@@ -0,0 +1,86 @@
+"""
+Process-local reply cache for the test-review chatbot.
+
+Replies are keyed by result, the candidate's attempt count (so progress
+answers refresh after a new test), the provider/model that produced them and
+the normalized message. Entries expire after ``OTS_CHAT_CACHE_TTL`` seconds and
+the least recently used ones are evicted beyond ``OTS_CHAT_CACHE_SIZE``.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+_WHITESPACE = re.compile(r'\s+')
+_EDGE_PUNCTUATION = re.compile(r'^[\s?!.,]+|[\s?!.,]+$')
+
+
+def normalize_message(message: str) -> str:
+    return _EDGE_PUNCTUATION.sub('', _WHITESPACE.sub(' ', message.lower()))
+
+
+def chat_cache_key(result, stats, provider, message: str) -> tuple:
+    source = f"{provider.name}:{getattr(provider, 'model', '')}" if provider is not None else 'rules'
+    return (result.resultid, stats.attempts, source, normalize_message(message))
+
+
+class ChatReplyCache:
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, reply: str):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, reply)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key, compute):
+        reply = self.get(key)
+        if reply is None:
+            reply = compute()
+            self.set(key, reply)
+        return reply
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+chat_cache = ChatReplyCache(
+    max_entries=getattr(settings, 'OTS_CHAT_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'OTS_CHAT_CACHE_TTL', 3600),
+)
@@ -0,0 +1,89 @@
+"""
+LLM providers for the test-review chatbot.
+
+Every provider offers ``complete(messages)`` for the blocking JSON endpoint and
+``stream(messages)``, an async iterator of text chunks, for the server-sent
+events endpoint. ``get_chat_provider`` picks one from settings:
+
+- ``OTS_CHAT_PROVIDER = 'fake'`` streams a canned reply locally at
+  ``OTS_FAKE_LLM_TOKENS_PER_SECOND``, for offline benchmarks and demos;
+- otherwise OpenAI is used when an API key is configured;
+- with neither, there is no provider and callers use the rule-based replies.
+"""
+import asyncio
+import os
+import time
+
+from django.conf import settings
+
+# OpenAI SDK (optional; used if OPENAI_API_KEY is configured)
+try:
+    from openai import AsyncOpenAI, OpenAI
+except Exception:
+    AsyncOpenAI = OpenAI = None
+
+OPENAI_MODEL = "gpt-4o-mini"
+
+
+class OpenAIProvider:
+    name = 'openai'
+
+    def __init__(self, api_key: str, model: str = OPENAI_MODEL):
+        self.api_key = api_key
+        self.model = model
+
+    def _params(self, messages):
+        return {'model': self.model, 'temperature': 0.2, 'max_tokens': 600, 'messages': messages}
+
+    def complete(self, messages) -> str:
+        completion = OpenAI(api_key=self.api_key).chat.completions.create(**self._params(messages))
+        return completion.choices[0].message.content or ""
+
+    async def stream(self, messages):
+        client = AsyncOpenAI(api_key=self.api_key)
+        response = await client.chat.completions.create(stream=True, **self._params(messages))
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class FakeProvider:
+    """Offline stand-in that answers with a canned reply at a fixed token rate."""
+    name = 'fake'
+
+    def __init__(self, tokens_per_second: float = 40.0, first_token_ms: float = 300.0, reply_tokens: int = 60):
+        self.token_delay = 1.0 / tokens_per_second if tokens_per_second > 0 else 0.0
+        self.first_token_delay = first_token_ms / 1000.0
+        self.reply_tokens = reply_tokens
+
+    def _tokens(self, messages):
+        question = messages[-1]['content'].rsplit('My question:', 1)[-1].strip() if messages else ''
+        words = f"(offline assistant) You asked: {question}. ".split()
+        while len(words) < self.reply_tokens:
+            words.append('review')
+        return [word + ' ' for word in words[:self.reply_tokens]]
+
+    def complete(self, messages) -> str:
+        tokens = self._tokens(messages)
+        time.sleep(self.first_token_delay + self.token_delay * (len(tokens) - 1))
+        return ''.join(tokens)
+
+    async def stream(self, messages):
+        await asyncio.sleep(self.first_token_delay)
+        for i, token in enumerate(self._tokens(messages)):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            yield token
+
+
+def get_chat_provider():
+    choice = getattr(settings, 'OTS_CHAT_PROVIDER', '')
+    if choice == 'fake':
+        return FakeProvider(
+            tokens_per_second=getattr(settings, 'OTS_FAKE_LLM_TOKENS_PER_SECOND', 40.0),
+            first_token_ms=getattr(settings, 'OTS_FAKE_LLM_FIRST_TOKEN_MS', 300.0),
+        )
+    api_key = os.getenv('OPENAI_API_KEY', '') or getattr(settings, 'OPENAI_API_KEY', '')
+    if not api_key or OpenAI is None:
+        return None
+    return OpenAIProvider(api_key)
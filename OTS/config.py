@@ -0,0 +1,24 @@
+"""
+Process-level cache for the TestConfig row.
+
+Views read the config through ``get_test_config``. Saving or deleting a
+TestConfig bumps the ``test_config`` version in the database; each process
+re-checks that version at most every VERSION_CHECK_SECONDS (OTS.versions)
+and only reloads the row when it has moved, so steady-state reads cost no
+queries.
+"""
+from OTS.models import TestConfig
+from OTS.versions import VersionedCache
+
+CONFIG_VERSION = 'test_config'
+
+_config = VersionedCache(CONFIG_VERSION, lambda version: TestConfig.objects.first())
+
+
+def get_test_config():
+    """Return the active TestConfig (or None when none is configured)."""
+    return _config.get()
+
+
+def invalidate_test_config():
+    _config.invalidate()
@@ -0,0 +1,76 @@
+"""
+Server-side store for running exam timers.
+
+Opening a test paper starts a timer for the questions on that paper, and
+submitting the paper or logging out finishes it. Each timer row's id is the
+attempt number. Reads go through the default cache and fall back to the
+database. Starting or finishing a timer writes the database first and then
+updates the cache, which must be shared by all worker processes (see CACHES
+in settings): with a per-process cache, a timer finished in one process
+would still be running in the others. Keeping the timer out of the session
+means a session is only saved when it really changes.
+"""
+from array import array
+
+from django.core.cache import cache
+from django.db.models import Case, F, JSONField, Value, When
+
+from OTS.models import ExamTimer
+
+# Cached "no running timer" marker, so idle candidates don't query either.
+_NO_TIMER = {}
+# Timers stay cached a little past their deadline.
+CACHE_GRACE_SECONDS = 300
+# ExamTimer.n is a PositiveSmallIntegerField.
+MAX_PAPER_QUESTIONS = 32767
+
+
+def _cache_key(username: str) -> str:
+    return f'exam_timer:{username}'
+
+
+def _as_dict(timer: ExamTimer) -> dict:
+    return {'attempt': timer.pk, 'n': timer.n, 'start_ts': timer.start_ts, 'duration_sec': timer.duration_sec,
+            'qids': array('q', bytes(timer.qids)).tolist()}
+
+
+def active_timer(username: str):
+    """Return the running timer as a dict (attempt, n, start_ts, duration_sec, qids), or None."""
+    timer = cache.get(_cache_key(username))
+    if timer is None:
+        open_timers = ExamTimer.objects.filter(candidate_id=username, finished=False).defer('saved_answers')
+        row = open_timers.order_by('-id').first()
+        timer = _as_dict(row) if row else _NO_TIMER
+        cache.set(_cache_key(username), timer, (row.duration_sec if row else 0) + CACHE_GRACE_SECONDS)
+    return timer or None
+
+
+def _finish_open_timers(username: str, timer: dict):
+    """Mark the candidate's open timers finished, storing what autosave still holds for ``timer``."""
+    from OTS.autosave import take_unflushed
+    fields = {'finished': True}
+    answers = take_unflushed(timer)
+    if answers is not None:
+        fields['saved_answers'] = Case(When(pk=timer['attempt'], then=Value(answers, output_field=JSONField())),
+                                       default=F('saved_answers'))
+    ExamTimer.objects.filter(candidate_id=username, finished=False).update(**fields)
+
+
+def start_timer(username: str, n: int, duration_sec: int, now_ts: int, qids) -> dict:
+    """Start a new attempt on the paper ``qids``, abandoning any timer still running."""
+    running = active_timer(username)
+    if running is not None:
+        _finish_open_timers(username, running)
+    timer = _as_dict(ExamTimer.objects.create(
+        candidate_id=username, n=n, start_ts=now_ts, duration_sec=duration_sec,
+        qids=array('q', qids).tobytes()))
+    cache.set(_cache_key(username), timer, duration_sec + CACHE_GRACE_SECONDS)
+    return timer
+
+
+def finish_timer(username: str):
+    timer = active_timer(username)
+    if timer is None:
+        return
+    _finish_open_timers(username, timer)
+    cache.set(_cache_key(username), _NO_TIMER, CACHE_GRACE_SECONDS)
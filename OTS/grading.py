@@ -0,0 +1,79 @@
+"""
+Grading for submitted test papers.
+
+``grade`` loads the answer key and question versions for the whole paper in a
+single query and scores it in one pass; ``record_result`` stores the outcome.
+Both the HTML form view and any API endpoint should go through these.
+"""
+from django.db import transaction
+from django.db.models import F
+
+from OTS.answer_codec import pack_answers
+from OTS.models import Candidate, Question, Result
+from OTS.stats import record_attempt
+
+
+class GradedPaper:
+    """Outcome of grading one paper, ready to be stored as a Result."""
+
+    def __init__(self, attempt, right, wrong, points, answers):
+        self.attempt = attempt
+        self.right = right
+        self.wrong = wrong
+        self.points = points
+        # (qid, question version, user, correct, is_correct) per question
+        self.answers = answers
+
+
+def grade(paper, answers) -> GradedPaper:
+    """
+    Grade a paper.
+
+    ``paper`` is the ordered list of qids that were handed out and ``answers``
+    maps qid -> chosen option ('A'..'D', empty when skipped). Questions that no
+    longer exist in the bank are left out of the score.
+    """
+    rows = Question.objects.filter(qid__in=paper).values_list('qid', 'version', 'ans')
+    key = {qid: (version, ans) for qid, version, ans in rows}
+
+    attempt = right = wrong = 0
+    graded = []
+    for qid in paper:
+        if qid not in key:
+            continue
+        version, ans = key[qid]
+        user_answer = (answers.get(qid) or '').upper()
+        correct_answer = (ans or '').upper()
+        is_correct = (user_answer == correct_answer) and (user_answer != '')
+
+        if user_answer:
+            attempt += 1
+            if is_correct:
+                right += 1
+            else:
+                wrong += 1
+
+        graded.append((qid, version, user_answer, correct_answer, is_correct))
+
+    total_questions = max(len(graded), 1)
+    points = (right - wrong) / total_questions * 10
+    return GradedPaper(attempt, right, wrong, points, graded)
+
+
+def record_result(username: str, graded: GradedPaper) -> Result:
+    """Store a graded paper and fold it into the candidate's totals atomically."""
+    with transaction.atomic():
+        result = Result.objects.create(
+            username_id=username,
+            attempt=graded.attempt,
+            right=graded.right,
+            wrong=graded.wrong,
+            points=graded.points,
+            answers=pack_answers(graded.answers)
+        )
+        Candidate.objects.filter(username=username).update(
+            test_attempted=F('test_attempted') + 1,
+            points=(F('points') * F('test_attempted') + graded.points) / (F('test_attempted') + 1),
+        )
+        record_attempt(username, graded.points)
+    return result
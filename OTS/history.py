@@ -0,0 +1,37 @@
+"""
+Keyset pagination over a candidate's results.
+
+Pages are addressed by the smallest ``resultid`` already shown, so each page
+is an index range scan on (username, resultid) regardless of how many
+attempts exist. The per-question ``answers`` column is never loaded here.
+"""
+from django.utils import formats
+
+from OTS.models import Result
+
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
+
+
+def history_page(username: str, before=None, limit: int = HISTORY_PAGE_SIZE):
+    """Return (results, next_cursor) for results older than ``before``."""
+    limit = max(1, min(limit, HISTORY_MAX_PAGE_SIZE))
+    qs = Result.objects.filter(username_id=username).defer('answers').order_by('-resultid')
+    if before is not None:
+        qs = qs.filter(resultid__lt=before)
+    rows = list(qs[:limit + 1])
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1].resultid
+    return rows, None
+
+
+def history_row(result: Result) -> dict:
+    return {
+        'resultid': result.resultid,
+        'date': formats.date_format(result.date),
+        'time': formats.time_format(result.time),
+        'attempt': result.attempt,
+        'right': result.right,
+        'wrong': result.wrong,
+        'points': round(result.points, 2),
+    }
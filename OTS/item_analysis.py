@@ -0,0 +1,166 @@
+"""
+Classical item analysis over stored results.
+
+``analyze_items`` streams Result.answers in chunks and decodes each chunk's
+packed records straight into NumPy arrays (see OTS.answer_codec). Each chunk
+is the coordinate form of a sparse result x question response matrix, one
+entry per question on a paper. ``np.bincount`` folds it into per-question
+accumulators, so no Python loop runs over individual answers. Only responses
+to a question's current version count towards its statistics.
+
+Per question it computes:
+
+- difficulty: the share answered correctly; skips count as wrong.
+- discrimination: the point-biserial correlation between answering correctly
+  and the share correct on the rest of the same paper.
+- how often each option was chosen and how often the question was skipped.
+
+For the bank it computes KR-20 for each paper length, pooled by the number
+of results.
+"""
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from OTS.answer_codec import RECORD_SIZE
+from OTS.models import ItemAnalysisRun, Question, QuestionAnalysis, Result
+
+# NumPy (optional; only needed for item analysis)
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+# Mirrors the '<qIB' struct in OTS.answer_codec.
+RECORD_DTYPE = [('qid', '<i8'), ('version', '<u4'), ('flags', 'u1')]
+OPTION_CODES = 5  # skipped, A, B, C, D
+
+
+class _Accumulator:
+    def __init__(self, bank_qids, bank_versions):
+        self.qids = bank_qids
+        self.versions = bank_versions
+        size = len(bank_qids)
+        self.size = size
+        self.responses = np.zeros(size)
+        self.correct = np.zeros(size)
+        self.options = np.zeros(size * OPTION_CODES)
+        # Sums for the point-biserial correlation x = correct, y = rest score.
+        self.pairs = np.zeros(size)
+        self.sum_x = np.zeros(size)
+        self.sum_y = np.zeros(size)
+        self.sum_yy = np.zeros(size)
+        self.sum_xy = np.zeros(size)
+        # Paper length -> [results, sum of scores, sum of squared scores, item counts]
+        self.lengths = {}
+        self.results = 0
+        self.records = 0
+
+    def fold(self, blobs):
+        lengths = np.fromiter((len(b) for b in blobs), dtype=np.int64, count=len(blobs)) // RECORD_SIZE
+        records = np.frombuffer(b''.join(blobs), dtype=RECORD_DTYPE)
+        row = np.repeat(np.arange(len(blobs)), lengths)
+        flags = records['flags']
+        is_correct = ((flags >> 6) & 1).astype(np.float64)
+        scores = np.bincount(row, weights=is_correct, minlength=len(blobs))
+        self.results += len(blobs)
+        self.records += len(records)
+
+        if not self.size:
+            return
+        col = np.minimum(np.searchsorted(self.qids, records['qid']), self.size - 1)
+        matched = (self.qids[col] == records['qid']) & (self.versions[col] == records['version'])
+        col, x = col[matched], is_correct[matched]
+        paper_length = lengths[row[matched]]
+        self.responses += np.bincount(col, minlength=self.size)
+        self.correct += np.bincount(col, weights=x, minlength=self.size)
+        self.options += np.bincount(col * OPTION_CODES + (flags[matched] & 7), minlength=self.size * OPTION_CODES)
+
+        multi = paper_length > 1
+        c, xm = col[multi], x[multi]
+        rest = (scores[row[matched]][multi] - xm) / (paper_length[multi] - 1)
+        self.pairs += np.bincount(c, minlength=self.size)
+        self.sum_x += np.bincount(c, weights=xm, minlength=self.size)
+        self.sum_y += np.bincount(c, weights=rest, minlength=self.size)
+        self.sum_yy += np.bincount(c, weights=rest * rest, minlength=self.size)
+        self.sum_xy += np.bincount(c, weights=xm * rest, minlength=self.size)
+
+        for length in np.unique(lengths):
+            on_length = lengths == length
+            totals = self.lengths.setdefault(int(length), [0, 0.0, 0.0, np.zeros(self.size)])
+            totals[0] += int(on_length.sum())
+            totals[1] += float(scores[on_length].sum())
+            totals[2] += float((scores[on_length] ** 2).sum())
+            totals[3] += np.bincount(col[paper_length == length], minlength=self.size)
+
+    def difficulty(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.correct / self.responses
+
+    def discrimination(self):
+        n = self.pairs
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = n * self.sum_xy - self.sum_x * self.sum_y
+            var_x = n * self.sum_x - self.sum_x ** 2
+            var_y = n * self.sum_yy - self.sum_y ** 2
+            return cov / np.sqrt(var_x * var_y)
+
+    def kr20(self):
+        p = np.nan_to_num(self.difficulty())
+        item_variance = p * (1 - p)
+        by_length = {}
+        for length, (results, total, total_sq, items) in sorted(self.lengths.items()):
+            variance = total_sq / results - (total / results) ** 2
+            if length > 1 and variance > 0:
+                mean_item_variance = float(items @ item_variance) / results
+                by_length[length] = (results, length / (length - 1) * (1 - mean_item_variance / variance))
+        weight = sum(results for results, _ in by_length.values())
+        pooled = sum(results * value for results, value in by_length.values()) / weight if weight else None
+        return pooled, {str(length): round(value, 4) for length, (_, value) in by_length.items()}
+
+
+def _finite(value):
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def analyze_items(chunk_size: int = 20000) -> ItemAnalysisRun:
+    """Recompute QuestionAnalysis for the whole bank and record the run."""
+    start = time.perf_counter()
+    bank = list(Question.objects.order_by('qid').values_list('qid', 'version'))
+    acc = _Accumulator(np.array([qid for qid, _ in bank], dtype=np.int64),
+                       np.array([version for _, version in bank], dtype=np.uint32))
+
+    blobs = []
+    for blob in Result.objects.values_list('answers', flat=True).iterator(chunk_size=chunk_size):
+        if blob:
+            blobs.append(bytes(blob))
+        if len(blobs) >= chunk_size:
+            acc.fold(blobs)
+            blobs = []
+    if blobs:
+        acc.fold(blobs)
+
+    difficulty, discrimination = acc.difficulty(), acc.discrimination()
+    options = acc.options.reshape(acc.size, OPTION_CODES)
+    kr20, kr20_by_length = acc.kr20()
+    now = timezone.now()
+    analyses = [
+        QuestionAnalysis(
+            question_id=int(acc.qids[i]), version=int(acc.versions[i]), responses=int(acc.responses[i]),
+            difficulty=float(difficulty[i]), discrimination=_finite(discrimination[i]),
+            skip_rate=float(options[i, 0] / acc.responses[i]),
+            rate_a=float(options[i, 1] / acc.responses[i]), rate_b=float(options[i, 2] / acc.responses[i]),
+            rate_c=float(options[i, 3] / acc.responses[i]), rate_d=float(options[i, 4] / acc.responses[i]),
+            analyzed_at=now,
+        )
+        for i in np.flatnonzero(acc.responses)
+    ]
+    with transaction.atomic():
+        QuestionAnalysis.objects.all().delete()
+        QuestionAnalysis.objects.bulk_create(analyses, batch_size=1000)
+        return ItemAnalysisRun.objects.create(
+            results=acc.results, responses=acc.records, kr20=kr20, kr20_by_length=kr20_by_length,
+            seconds=time.perf_counter() - start,
+        )
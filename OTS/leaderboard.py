@@ -0,0 +1,135 @@
+"""
+Global leaderboard over candidates' average points.
+
+Averages are counted in a histogram of 0.01-point buckets (LeaderboardBucket,
+at most 2001 rows for averages between -10 and 10). Each submission moves its
+candidate between two buckets in the same transaction, so the counts stay
+exact without ever sorting candidates. Each process mirrors the histogram in
+a Fenwick tree, rebuilt when the ``leaderboard`` version moves (checked at
+most every VERSION_CHECK_SECONDS, see OTS.versions). The version is bumped
+after the submission commits, so the single CacheVersion row is never locked
+for the length of a grading transaction. ``standing`` therefore costs O(log
+buckets) and no queries. ``top`` reads the best K candidates off the index on
+CandidateStats.average_points, the same average the buckets count, and reuses
+each list for TOP_SECONDS: a leader's points move without changing buckets.
+Candidates whose averages share a bucket share a rank.
+"""
+import time
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from OTS.models import CandidateStats, LeaderboardBucket
+from OTS.versions import VERSION_CHECK_SECONDS, VersionedCache, bump_version
+
+LEADERBOARD_VERSION = 'leaderboard'
+SCALE = 100
+MIN_BUCKET, MAX_BUCKET = -10 * SCALE, 10 * SCALE
+TOP_SECONDS = VERSION_CHECK_SECONDS
+
+
+def bucket(score: float) -> int:
+    return min(MAX_BUCKET, max(MIN_BUCKET, round(score * SCALE)))
+
+
+class _Fenwick:
+    """Prefix sums over bucket counts; index 0 is MIN_BUCKET."""
+
+    def __init__(self, counts: dict):
+        self.size = MAX_BUCKET - MIN_BUCKET + 1
+        self.tree = [0] * (self.size + 1)
+        for score, count in counts.items():
+            self.tree[score - MIN_BUCKET + 1] += count
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+        self.total = sum(counts.values())
+
+    def at_most(self, score: int) -> int:
+        """Candidates in buckets <= score."""
+        i, total = score - MIN_BUCKET + 1, 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+
+class Standing:
+    def __init__(self, rank, total, percentile):
+        self.rank = rank
+        self.total = total
+        # Share of candidates scoring the same or lower, 0-100.
+        self.percentile = percentile
+
+
+def _add(score: int, delta: int):
+    if LeaderboardBucket.objects.filter(score=score).update(candidates=F('candidates') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            LeaderboardBucket.objects.create(score=score, candidates=delta)
+    except IntegrityError:
+        LeaderboardBucket.objects.filter(score=score).update(candidates=F('candidates') + delta)
+
+
+def record_score_change(old_average, new_average: float):
+    """Move a candidate from ``old_average`` (None if unranked) to ``new_average``."""
+    old = bucket(old_average) if old_average is not None else None
+    new = bucket(new_average)
+    if old == new:
+        return
+    if old is not None:
+        _add(old, -1)
+    _add(new, 1)
+    transaction.on_commit(lambda: bump_version(LEADERBOARD_VERSION))
+
+
+def rebuild_leaderboard() -> int:
+    """Recount the histogram from CandidateStats; returns the ranked candidates."""
+    counts = Counter()
+    rows = CandidateStats.objects.filter(attempts__gt=0).values_list('average_points', flat=True)
+    for average in rows.iterator(chunk_size=10000):
+        counts[bucket(average)] += 1
+    with transaction.atomic():
+        LeaderboardBucket.objects.all().delete()
+        LeaderboardBucket.objects.bulk_create(
+            [LeaderboardBucket(score=score, candidates=count) for score, count in counts.items()], batch_size=500)
+        bump_version(LEADERBOARD_VERSION)
+    invalidate_leaderboard()
+    return sum(counts.values())
+
+
+def _load_histogram(version):
+    """The histogram as a Fenwick tree, plus an empty cache of (loaded at, top list) by k."""
+    rows = LeaderboardBucket.objects.filter(candidates__gt=0).values_list('score', 'candidates')
+    return _Fenwick(dict(rows)), {}
+
+
+_histogram = VersionedCache(LEADERBOARD_VERSION, _load_histogram)
+
+
+def standing(average: float) -> Standing:
+    """Rank and percentile of a candidate with this average points."""
+    tree, _ = _histogram.get()
+    score = bucket(average)
+    total = max(tree.total, 1)
+    at_most = tree.at_most(score)
+    return Standing(rank=tree.total - at_most + 1, total=tree.total, percentile=round(100 * at_most / total))
+
+
+def top(k: int = 10) -> list:
+    """The best ``k`` candidates as dicts (username, name, points, test_attempted)."""
+    _, top_lists = _histogram.get()
+    loaded_at, leaders = top_lists.get(k, (None, None))
+    if leaders is None or time.monotonic() - loaded_at >= TOP_SECONDS:
+        leaders = list(CandidateStats.objects.filter(attempts__gt=0).order_by('-average_points', 'candidate_id')
+                       .values(username=F('candidate_id'), name=F('candidate__name'),
+                               points=F('average_points'), test_attempted=F('attempts'))[:k])
+        top_lists[k] = (time.monotonic(), leaders)
+    return leaders
+
+
+def invalidate_leaderboard():
+    _histogram.invalidate()
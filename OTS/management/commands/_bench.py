@@ -0,0 +1,49 @@
+"""
+Helpers for the OTS ``bench_*`` management commands that need its models.
+The app-independent ones live in ots_common.bench.
+"""
+import re
+from collections import Counter
+
+from django.test import Client
+
+from OTS.models import Candidate, Question
+
+
+def fill_question_bank(total, batch_size=5000):
+    """Grow the Question table to ``total`` rows with synthetic questions."""
+    existing = Question.objects.count()
+    while existing < total:
+        size = min(batch_size, total - existing)
+        Question.objects.bulk_create([
+            Question(
+                que=f'Synthetic question {existing + i}: which option is correct?',
+                a='Option A text', b='Option B text', c='Option C text', d='Option D text',
+                ans='ABCD'[(existing + i) % 4],
+            )
+            for i in range(size)
+        ])
+        existing += size
+
+
+def logged_in_client(username='bench', password='bench'):
+    Candidate.objects.get_or_create(username=username, defaults={'password': password, 'name': 'Bench User'})
+    client = Client()
+    client.post('/login', {'username': username, 'password': password})
+    return client
+
+
+_WRITE = re.compile(r'\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+"?(\w+)"?', re.I)
+
+
+class WriteCounter:
+    """connection.execute_wrapper that counts INSERT/UPDATE/DELETE statements per table."""
+
+    def __init__(self):
+        self.by_table = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        match = _WRITE.match(sql)
+        if match:
+            self.by_table[match.group(1)] += 1
+        return execute(sql, params, many, context)
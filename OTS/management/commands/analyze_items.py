@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from OTS import item_analysis
+
+
+class Command(BaseCommand):
+    help = 'Compute difficulty, discrimination, option rates and KR-20 reliability from stored results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=20000, help='Results decoded per NumPy batch')
+
+    def handle(self, *args, **options):
+        if item_analysis.np is None:
+            raise CommandError('Item analysis needs NumPy: pip install numpy')
+        run = item_analysis.analyze_items(options['chunk_size'])
+        kr20 = f'{run.kr20:.3f}' if run.kr20 is not None else 'n/a'
+        self.stdout.write(self.style.SUCCESS(
+            f'Analyzed {run.responses} responses from {run.results} results in {run.seconds:.1f}s; KR-20 {kr20}.'))
@@ -0,0 +1,70 @@
+import json
+import random
+import re
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+
+from OTS.models import ExamTimer
+from ots_common.bench import scratch_database
+from ._bench import WriteCounter, fill_question_bank, logged_in_client
+
+
+class Command(BaseCommand):
+    help = 'Count database writes for answer autosave, flushing every change vs write-behind batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidates', type=int, default=50)
+        parser.add_argument('--clicks', type=int, default=30, help='Answer changes per candidate')
+        parser.add_argument('--click-interval', type=float, default=4.0,
+                            help='Simulated seconds between a candidate\'s changes')
+        parser.add_argument('-n', type=int, default=10, help='Questions per paper')
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        modes = [('every change', {'OTS_AUTOSAVE_FLUSH_CHANGES': 1}), ('write-behind', {})]
+        clicks = options['candidates'] * options['clicks']
+
+        with scratch_database():
+            fill_question_bank(1000)
+            for mode, (label, overrides) in enumerate(modes):
+                cache.clear()
+                sessions = []
+                for i in range(options['candidates']):
+                    client = logged_in_client(f'auto{mode}-{i}')
+                    page = client.get(f'/test-paper?n={options["n"]}').content.decode()
+                    attempt = int(re.search(r'attempt: (\d+)', page).group(1))
+                    sessions.append((client, attempt, re.findall(r'name="qno(\d+)"', page), {}))
+
+                counter = WriteCounter()
+                clock = time.time()
+                with override_settings(**overrides), connection.execute_wrapper(counter), \
+                        mock.patch('time.time', lambda: clock):
+                    for _ in range(options['clicks']):
+                        clock += options['click_interval']
+                        for client, attempt, qids, answers in sessions:
+                            qid, option = rng.choice(qids), rng.choice('ABCD')
+                            answers[qid] = option
+                            response = client.post('/api/autosave', json.dumps({'attempt': attempt, 'answers': {qid: option}}),
+                                                   content_type='application/json')
+                            if response.status_code != 200:
+                                raise CommandError(f'autosave failed: {response.status_code} {response.content!r}')
+
+                    lost = 0
+                    for client, attempt, qids, answers in sessions:
+                        page = client.get(f'/test-paper?n={options["n"]}').content.decode()
+                        restored = json.loads(re.search(r'id="saved-answers"[^>]*>(.*?)</script>', page).group(1))
+                        lost += restored != answers
+                    stored = sum(len(a) for a in ExamTimer.objects.filter(pk__in=[s[1] for s in sessions])
+                                 .values_list('saved_answers', flat=True))
+
+                writes = counter.by_table['OTS_examtimer']
+                self.stdout.write(f'{label:>13}: {writes} database writes for {clicks} changes '
+                                  f'({writes / clicks:.2f}/change), {stored} answers already in the database')
+                if lost:
+                    raise CommandError(f'{lost} candidates did not get their answers back after a reload')
+        self.stdout.write(self.style.SUCCESS('Every reload restored the latest answers.'))
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+
+from OTS.grading import GradedPaper, record_result
+from ots_common.bench import percentile, scratch_database
+from ._bench import logged_in_client
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the streaming chatbot endpoint against the blocking one using the fake LLM provider'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--conversations', type=int, default=100, help='Concurrent chat requests')
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Worker threads available to the blocking endpoint')
+        parser.add_argument('--tokens-per-second', type=float, default=40.0)
+        parser.add_argument('--first-token-ms', type=float, default=300.0)
+
+    def handle(self, *args, **options):
+        conversations = options['conversations']
+        # Distinct messages so the reply cache never answers for the provider.
+        bodies = [json.dumps({'message': f'explain my mistakes ({i})'}) for i in range(conversations * 2)]
+
+        with scratch_database(on_disk=True), override_settings(
+                OTS_CHAT_PROVIDER='fake',
+                OTS_FAKE_LLM_TOKENS_PER_SECOND=options['tokens_per_second'],
+                OTS_FAKE_LLM_FIRST_TOKEN_MS=options['first_token_ms']):
+            client = logged_in_client()
+            record_result('bench', GradedPaper(1, 1, 0, 10.0, []))
+            cookies = client.cookies
+
+            async def one_stream(async_client, body):
+                start = time.perf_counter()
+                response = await async_client.post('/api/chat/stream', body, content_type='application/json')
+                first_token = None
+                tokens = 0
+                async for chunk in response.streaming_content:
+                    if b'"token"' in chunk:
+                        tokens += 1
+                        if first_token is None:
+                            first_token = time.perf_counter() - start
+                return first_token or 0.0, time.perf_counter() - start, tokens
+
+            async def run_streams():
+                async_client = AsyncClient()
+                async_client.cookies = cookies
+                return await asyncio.gather(*(one_stream(async_client, body) for body in bodies[:conversations]))
+
+            start = time.perf_counter()
+            streamed = asyncio.run(run_streams())
+            stream_elapsed = time.perf_counter() - start
+
+            def one_blocking(body):
+                sync_client = Client()
+                sync_client.cookies = cookies
+                begin = time.perf_counter()
+                sync_client.post('/api/chat', body, content_type='application/json')
+                return time.perf_counter() - begin
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                blocking = sorted(pool.map(one_blocking, bodies[conversations:]))
+            blocking_elapsed = time.perf_counter() - start
+
+        ttft = sorted(s[0] for s in streamed)
+        total_tokens = sum(s[2] for s in streamed)
+        self.stdout.write(f'streaming: {conversations} conversations in {stream_elapsed:.2f}s '
+                          f'({conversations / stream_elapsed:.1f} replies/s, {total_tokens / stream_elapsed:.0f} tokens/s), '
+                          f'time to first token p50={percentile(ttft, 50) * 1000:.0f}ms '
+                          f'p95={percentile(ttft, 95) * 1000:.0f}ms')
+        self.stdout.write(f'blocking ({options["workers"]} workers): {conversations} conversations in '
+                          f'{blocking_elapsed:.2f}s ({conversations / blocking_elapsed:.1f} replies/s), '
+                          f'full reply p50={percentile(blocking, 50) * 1000:.0f}ms '
+                          f'p95={percentile(blocking, 95) * 1000:.0f}ms')
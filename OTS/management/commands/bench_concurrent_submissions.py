@@ -0,0 +1,64 @@
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from OTS.grading import GradedPaper, record_result
+from OTS.models import Candidate, CandidateStats, Result
+from ots_common.bench import scratch_database
+
+
+class Command(BaseCommand):
+    help = 'Fire parallel submissions at record_result and verify the candidate totals are exact'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--submissions', type=int, default=500)
+        parser.add_argument('--candidates', type=int, default=5)
+        parser.add_argument('--workers', type=int, default=32)
+
+    def handle(self, *args, **options):
+        submissions = options['submissions']
+        usernames = [f'load{i}' for i in range(options['candidates'])]
+        plan = [(random.choice(usernames), random.randint(-10, 10)) for _ in range(submissions)]
+
+        def submit(item):
+            username, points = item
+            try:
+                record_result(username, GradedPaper(10, 0, 0, float(points), []))
+            finally:
+                close_old_connections()
+
+        with scratch_database(on_disk=True):
+            Candidate.objects.bulk_create([Candidate(username=u, password='x', name=u) for u in usernames])
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                list(pool.map(submit, plan))
+            elapsed = time.perf_counter() - start
+
+            failures = []
+            for username in usernames:
+                expected = [p for u, p in plan if u == username]
+                stats = CandidateStats.objects.filter(candidate_id=username).first()
+                candidate = Candidate.objects.get(username=username)
+                attempts = stats.attempts if stats else 0
+                if attempts != len(expected) or candidate.test_attempted != len(expected):
+                    failures.append(f'{username}: {attempts} stats / {candidate.test_attempted} candidate '
+                                    f'attempts, expected {len(expected)}')
+                elif expected and (stats.points_sum != sum(expected) or stats.best_points != max(expected)
+                                   or not math.isclose(candidate.points, sum(expected) / len(expected),
+                                                       abs_tol=1e-6)):
+                    failures.append(f'{username}: points drifted')
+                elif expected:
+                    recent = Result.objects.filter(username_id=username).values_list('points', flat=True)[:10]
+                    if stats.recent_points != list(reversed(recent)):
+                        failures.append(f'{username}: recent window out of order')
+            stored = Result.objects.count()
+
+        self.stdout.write(f'{submissions} submissions from {options["workers"]} threads in {elapsed:.2f}s '
+                          f'({submissions / elapsed:.0f}/s), {stored} results stored')
+        if failures or stored != submissions:
+            raise CommandError('Lost updates detected:\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('All candidate totals are exact.'))
@@ -0,0 +1,42 @@
+import csv
+import os
+import tempfile
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from OTS.models import Question
+from ots_common.bench import scratch_database
+
+
+class Command(BaseCommand):
+    help = 'Time import_questions on a synthetic CSV, then re-import it to check deduplication'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000)
+        parser.add_argument('--duplicate-every', type=int, default=20, help='Repeat an earlier row every N rows')
+        parser.add_argument('--chunk-size', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        rows, every = options['rows'], options['duplicate_every']
+        path = os.path.join(tempfile.mkdtemp(prefix='ots-bench-'), 'questions.csv')
+        with open(path, 'w', newline='') as fh:
+            writer = csv.writer(fh)
+            writer.writerow(['que', 'a', 'b', 'c', 'd', 'ans'])
+            for i in range(rows):
+                k = i // 2 if every and i % every == every - 1 else i
+                writer.writerow([f'Imported question {k}: which option is correct?',
+                                 f'Option A {k}', f'Option B {k}', f'Option C {k}', f'Option D {k}', 'ABCD'[k % 4]])
+        self.stdout.write(f'{rows} rows, {os.path.getsize(path) / 1e6:.1f} MB')
+
+        with scratch_database(on_disk=True):
+            for label in ('import', 're-import'):
+                out = StringIO()
+                start = time.perf_counter()
+                call_command('import_questions', path, chunk_size=options['chunk_size'], stdout=out)
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f'{label}: {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s), '
+                                  f'bank holds {Question.objects.count()}')
+        os.remove(path)
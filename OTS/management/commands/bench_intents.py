@@ -0,0 +1,61 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from OTS.views import CHAT_INTENTS
+
+FILLER = ('please can you tell me about my latest test and the topics i should review before the exam '
+          'because i am not sure which areas need work').split()
+PHRASES = ['hello', 'show my mistakes', 'what is my score', 'explain question 12 and 14', 'my progress',
+           'how did i do', 'which ones were wrong', 'thanks']
+
+
+def legacy_intent(message):
+    """The substring-chain matching the chatbot used before the intent engine."""
+    lower = message.lower()
+    if any(k in lower for k in ['hello', 'hi', 'hey']):
+        return 'greeting'
+    elif any(k in lower for k in ['best', 'progress', 'streak', 'improv', 'trend']):
+        return 'progress'
+    elif any(k in lower for k in ['score', 'points', 'how did i do', 'result']):
+        return 'score'
+    elif any(k in lower for k in ['mistake', 'mistakes', 'wrong']):
+        return 'mistakes'
+    elif 'explain question' in lower:
+        return 'explain_question'
+    return None
+
+
+class Command(BaseCommand):
+    help = 'Benchmark chatbot intent matching throughput on a synthetic message corpus'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=200000)
+        parser.add_argument('--words', type=int, default=30, help='Filler words per message')
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        corpus = []
+        for _ in range(options['messages']):
+            words = rng.choices(FILLER, k=options['words'])
+            words.insert(rng.randrange(len(words) + 1), rng.choice(PHRASES))
+            corpus.append(' '.join(words))
+        total_bytes = sum(len(m) for m in corpus)
+
+        def engine_intent(message):
+            match = CHAT_INTENTS.match(message)
+            return match.intent if match else None
+
+        labels = {}
+        for label, matcher in (('intent engine', engine_intent), ('substring chain', legacy_intent)):
+            start = time.perf_counter()
+            labels[label] = [matcher(message) for message in corpus]
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f'{label:>16}: {len(corpus) / elapsed:>10.0f} msgs/s '
+                              f'{total_bytes / elapsed / 1e6:>7.1f} MB/s')
+        # The substring chain stops at its first hit, which is often a
+        # false one ("hi" inside "which"), so report how often they differ.
+        differing = sum(a != b for a, b in zip(labels['intent engine'], labels['substring chain']))
+        self.stdout.write(f'classified differently: {differing} of {len(corpus)} messages')
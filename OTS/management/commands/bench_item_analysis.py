@@ -0,0 +1,82 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from OTS import item_analysis
+from OTS.models import Candidate, Question, QuestionAnalysis, Result
+from ots_common.bench import scratch_database
+from ._bench import fill_question_bank
+
+
+class Command(BaseCommand):
+    help = 'Time analyze_items on synthetic results and check its statistics against the simulated truth'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--results', type=int, default=1000000)
+        parser.add_argument('-n', type=int, default=10, help='Questions per result')
+        parser.add_argument('--bank', type=int, default=2000, help='Question bank size')
+        parser.add_argument('--batch-size', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        np = item_analysis.np
+        if np is None:
+            raise CommandError('Item analysis needs NumPy: pip install numpy')
+        total, n, batch = options['results'], options['n'], options['batch_size']
+        rng = np.random.default_rng(0)
+
+        with scratch_database():
+            fill_question_bank(options['bank'])
+            bank = Question.objects.order_by('qid').values_list('qid', 'ans')
+            qids = np.array([qid for qid, _ in bank], dtype=np.int64)
+            keys = np.array(['ABCD'.index(ans) + 1 for _, ans in bank], dtype=np.uint8)
+            # Simple Rasch model: P(correct) = logistic(ability - difficulty).
+            difficulty = rng.normal(0, 1, len(qids))
+            Candidate.objects.create(username='bench', password='bench', name='Bench User')
+
+            start = time.perf_counter()
+            for offset in range(0, total, batch):
+                size = min(batch, total - offset)
+                picks = rng.integers(0, len(qids), (size, n))
+                ability = rng.normal(0, 1, (size, 1))
+                correct = rng.random((size, n)) < 1 / (1 + np.exp(difficulty[picks] - ability))
+                wrong = (keys[picks] + rng.integers(1, 4, (size, n)) - 1) % 4 + 1
+                skipped = rng.random((size, n)) < 0.1
+                chosen = np.where(correct, keys[picks], np.where(skipped, 0, wrong)).astype(np.uint8)
+                records = np.zeros((size, n), dtype=item_analysis.RECORD_DTYPE)
+                records['qid'] = qids[picks]
+                records['version'] = 1
+                records['flags'] = chosen | (keys[picks] << 3) | (correct.astype(np.uint8) << 6)
+                raw = records.tobytes()
+                width = records.itemsize * n
+                with transaction.atomic():
+                    Result.objects.bulk_create([
+                        Result(username_id='bench', attempt=n, right=0, wrong=0, points=0.0,
+                               answers=raw[i * width:(i + 1) * width])
+                        for i in range(size)
+                    ], batch_size=5000)
+            self.stdout.write(f'stored {total} results ({total * n} answered items) in '
+                              f'{time.perf_counter() - start:.1f}s')
+
+            run = item_analysis.analyze_items(options['batch_size'])
+            self.stdout.write(f'analyze_items: {run.responses} responses in {run.seconds:.1f}s '
+                              f'({run.responses / run.seconds / 1e6:.2f}M/s), KR-20 {run.kr20:.3f}')
+
+            rows = QuestionAnalysis.objects.order_by('question_id').values_list('question_id', 'difficulty', 'discrimination')
+            index = {qid: i for i, qid in enumerate(qids)}
+            # discrimination is None for items too rarely answered (or always the same) to correlate.
+            measured = np.array([[difficulty[index[qid]], p, np.nan if r is None else r] for qid, p, r in rows],
+                                dtype=float)
+            agreement = np.corrcoef(measured[:, 0], measured[:, 1])[0, 1]
+            discrimination = np.nanmean(measured[:, 2]) if not np.isnan(measured[:, 2]).all() else np.nan
+            self.stdout.write(f'correlation of simulated difficulty with measured p-value: {agreement:.3f}; '
+                              f'mean discrimination {discrimination:.3f} '
+                              f'({np.isnan(measured[:, 2]).sum()} items without one)')
+            # p-values from a few dozen responses per item are noisy; only demand a tight fit at volume.
+            per_item = total * n / len(qids)
+            if per_item < 10:
+                self.stdout.write(f'{per_item:.1f} responses per item: too few to check the fit')
+                return
+            required = -0.9 if per_item >= 100 else -0.5
+            if agreement > required or not discrimination > 0:
+                raise CommandError('Item statistics do not match the simulated responses')
@@ -0,0 +1,75 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from OTS import leaderboard
+from OTS.models import Candidate, CandidateStats
+from ots_common.bench import measure, scratch_database
+
+
+class Command(BaseCommand):
+    help = 'Benchmark leaderboard rank, top-K and update costs against sorting the candidates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidates', type=int, default=1000000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        total, repeat, batch = options['candidates'], options['repeat'], options['batch_size']
+        rng = random.Random(0)
+
+        with scratch_database():
+            start = time.perf_counter()
+            for offset in range(0, total, batch):
+                rows = []
+                for i in range(offset, min(offset + batch, total)):
+                    attempts = rng.randint(1, 20)
+                    rows.append((f'c{i}', attempts, sum(rng.uniform(-10, 10) for _ in range(3)) / 3 * attempts))
+                with transaction.atomic():
+                    Candidate.objects.bulk_create([
+                        Candidate(username=u, password='x', name=u, test_attempted=a, points=s / a) for u, a, s in rows])
+                    CandidateStats.objects.bulk_create([
+                        CandidateStats(candidate_id=u, attempts=a, points_sum=s, average_points=s / a) for u, a, s in rows])
+            self.stdout.write(f'loaded {total} candidates in {time.perf_counter() - start:.1f}s')
+
+            start = time.perf_counter()
+            leaderboard.rebuild_leaderboard()
+            self.stdout.write(f'rebuild_leaderboard: {time.perf_counter() - start:.2f}s')
+
+            probe = CandidateStats.objects.get(candidate_id=f'c{total // 2}')
+            averages = iter([rng.uniform(-10, 10) for _ in range(repeat + 2)])
+
+            def naive_rank():
+                ordered = (CandidateStats.objects.filter(attempts__gt=0).order_by('-average_points')
+                           .values_list('candidate_id', flat=True))
+                return list(ordered).index(probe.candidate_id) + 1
+
+            def counted_rank():
+                return CandidateStats.objects.filter(attempts__gt=0, average_points__gt=probe.average_points).count() + 1
+
+            def update():
+                # Moves a synthetic candidate in from an existing bucket so counts stay valid.
+                with transaction.atomic():
+                    leaderboard.record_score_change(probe.average_points, next(averages))
+                    leaderboard.record_score_change(None, probe.average_points)
+
+            naive, _ = measure(naive_rank, repeat=max(1, repeat // 10))
+            counted, _ = measure(counted_rank, repeat)
+            leaderboard.standing(probe.average_points)
+            histogram, _ = measure(lambda: leaderboard.standing(probe.average_points), repeat * 100)
+            top_k, _ = measure(lambda: list(CandidateStats.objects.filter(attempts__gt=0)
+                                            .order_by('-average_points', 'candidate_id')[:10]), repeat)
+            rank = leaderboard.standing(probe.average_points).rank
+            exact = naive_rank()
+            updated, _ = measure(update, repeat)
+
+            self.stdout.write(f'rank by sorting all candidates: {naive * 1000:9.2f}ms (rank {exact})')
+            self.stdout.write(f'rank by COUNT over average idx:{counted * 1000:9.2f}ms')
+            self.stdout.write(f'rank from histogram:           {histogram * 1e6:9.2f}us (rank {rank})')
+            self.stdout.write(f'top 10 from average index:     {top_k * 1000:9.2f}ms')
+            self.stdout.write(f'two submission bucket moves:   {updated * 1000:9.2f}ms')
+            if abs(rank - exact) > CandidateStats.objects.count() // 1000:
+                raise CommandError(f'histogram rank {rank} is far from the exact rank {exact}')
@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from ots_common.metrics import Registry
+
+
+def make_registry():
+    registry = Registry()
+    registry.counter('bench_submissions_total', 'Submissions', ['app'])
+    registry.histogram('bench_grading_seconds', 'Grading time', ['app'])
+    registry.gauge('bench_open', 'Open streams')
+    return registry
+
+
+def request_work(registry):
+    # What calculateTestResult adds to a request: a timed histogram and a counter.
+    with registry.metrics['bench_grading_seconds'].time(app='OTS'):
+        pass
+    registry.metrics['bench_submissions_total'].inc(app='OTS')
+
+
+def worker(directory, increments, stay, done):
+    with override_settings(OTS_METRICS_DIR=directory, OTS_METRICS_FLUSH_SECONDS=0.05):
+        registry = make_registry()
+        registry.metrics['bench_open'].inc()
+        for _ in range(increments):
+            request_work(registry)
+        registry.flush()
+        done.set()
+        stay.wait()
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request cost of recording metrics and check totals merged across processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200000)
+        parser.add_argument('--processes', type=int, default=4)
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        directory = tempfile.mkdtemp(prefix='ots-metrics-')
+        try:
+            for label, path in (('single process', ''), ('shared directory', directory)):
+                with override_settings(OTS_METRICS_DIR=path):
+                    registry = make_registry()
+                    start = time.perf_counter()
+                    for _ in range(total):
+                        request_work(registry)
+                    elapsed = time.perf_counter() - start
+                self.stdout.write(f'{label}: {elapsed / total * 1e6:.2f}µs of metrics work per submission')
+            shutil.rmtree(directory)
+            os.makedirs(directory)
+
+            # Half the workers exit before the scrape: their counts must stay, their gauges must go.
+            processes = options['processes']
+            increments = 1000
+            context = multiprocessing.get_context('fork')
+            stay = context.Event()
+            workers = []
+            for i in range(processes):
+                done = context.Event()
+                process = context.Process(target=worker,
+                                          args=(directory, increments, stay if i % 2 else context.Event(), done))
+                workers.append((process, done))
+            for process, _ in workers:
+                process.start()
+            for i, (process, done) in enumerate(workers):
+                done.wait()
+                if not i % 2:
+                    process.terminate()
+                    process.join()
+            with override_settings(OTS_METRICS_DIR=directory):
+                registry = make_registry()
+                start = time.perf_counter()
+                text = registry.render()
+                render = time.perf_counter() - start
+            stay.set()
+            for process, _ in workers:
+                process.join()
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        submissions = float(re.search(r'^bench_submissions_total\{app="OTS"\} (\S+)$', text, re.M).group(1))
+        observed = float(re.search(r'^bench_grading_seconds_count\{app="OTS"\} (\S+)$', text, re.M).group(1))
+        open_streams = float(re.search(r'^bench_open (\S+)$', text, re.M).group(1))
+        self.stdout.write(f'/metrics over {processes} process files rendered in {render * 1000:.2f}ms: '
+                          f'{submissions:.0f} submissions, {observed:.0f} timings, {open_streams:.0f} open')
+        live = processes // 2
+        if submissions != processes * increments or observed != processes * increments or open_streams != live:
+            raise CommandError(f'Expected {processes * increments} submissions and timings and {live} open')
+        self.stdout.write(self.style.SUCCESS('Totals merged correctly across processes.'))
@@ -0,0 +1,58 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import override_settings
+
+from OTS.models import PaperPoolEntry
+from OTS.paper_pool import fill_pool
+from ots_common.bench import percentile, scratch_database
+from ._bench import fill_question_bank, logged_in_client
+
+
+class Command(BaseCommand):
+    help = 'Simulate a cohort opening test-paper at once, with and without the pre-built paper pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidates', type=int, default=300)
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument('--bank', type=int, default=10000, help='Question bank size')
+        parser.add_argument('-n', type=int, default=10, help='Questions per paper')
+
+    def handle(self, *args, **options):
+        candidates, n = options['candidates'], options['n']
+
+        with scratch_database(on_disk=True), override_settings(OTS_PAPER_POOL_LOW_WATER=0):
+            fill_question_bank(options['bank'])
+
+            def open_paper(client):
+                try:
+                    start = time.perf_counter()
+                    response = client.get(f'/test-paper?n={n}')
+                    return time.perf_counter() - start, response.status_code
+                finally:
+                    close_old_connections()
+
+            def herd(cohort):
+                # Each candidate opens a fresh paper; reloads would reuse their running attempt.
+                clients = [logged_in_client(f'{cohort}{i}') for i in range(candidates)]
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                    outcomes = list(pool.map(open_paper, clients))
+                elapsed = time.perf_counter() - start
+                if any(status != 200 for _, status in outcomes):
+                    raise CommandError('test-paper returned an error during the run')
+                return elapsed, sorted(t for t, _ in outcomes)
+
+            for label, cohort in (('live sampling', 'live'), ('paper pool', 'pool')):
+                if cohort == 'pool':
+                    fill_pool(n, candidates)
+                elapsed, latencies = herd(cohort)
+                self.stdout.write(f'{label:>13}: {candidates} papers in {elapsed:.2f}s '
+                                  f'({candidates / elapsed:.0f}/s), p50={percentile(latencies, 50) * 1000:.1f}ms '
+                                  f'p95={percentile(latencies, 95) * 1000:.1f}ms')
+            left = PaperPoolEntry.objects.filter(n=n).count()
+        if left:
+            raise CommandError(f'{left} pooled papers were never claimed')
+        self.stdout.write(self.style.SUCCESS('The pool drained completely without errors.'))
@@ -0,0 +1,93 @@
+import asyncio
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import AsyncClient, Client
+
+from OTS.models import Candidate, Result
+from OTS.result_export import ResultSource, export_chunks, gzipped
+from ots_common.bench import scratch_database
+
+
+def insert_results(count, candidates=100, batch=20000):
+    table = Result._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, count, batch):
+            cursor.executemany(
+                f'INSERT INTO "{table}" (username_id, date, time, attempt, "right", wrong, points, answers) '
+                f"VALUES (%s, %s, '12:00:00', 10, %s, %s, %s, X'')",
+                [(f'bench{i % candidates}', f'2024-{1 + i % 12:02d}-{1 + i % 28:02d}', i % 11, 10 - i % 11,
+                  (i % 11) * 2 - 10.0) for i in range(start, min(count, start + batch))])
+
+
+class Command(BaseCommand):
+    help = 'Check that streaming result exports keep memory flat as the number of rows grows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,1000000', help='Comma-separated result counts')
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(n) for n in options['sizes'].split(','))
+        with scratch_database(on_disk=True):
+            Candidate.objects.bulk_create([Candidate(username=f'bench{i}', password='bench', name=f'Bench {i}')
+                                           for i in range(100)])
+            stored = 0
+            for size in sizes:
+                insert_results(size - stored)
+                stored = size
+                for fmt, gzip in (('csv', False), ('ndjson', False), ('csv', True)):
+                    def export():
+                        chunks = export_chunks(ResultSource(), fmt)
+                        return sum(len(chunk) for chunk in (gzipped(chunks) if gzip else chunks))
+
+                    start = time.perf_counter()
+                    written = export()
+                    elapsed = time.perf_counter() - start
+                    # Traced separately: tracemalloc slows the export several times over.
+                    tracemalloc.start()
+                    export()
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    label = fmt + ('.gz' if gzip else '')
+                    self.stdout.write(f'{size:>9} rows {label:<9} {written / 1e6:8.1f} MB in '
+                                      f'{elapsed:6.2f}s ({size / elapsed:,.0f} rows/s), peak {peak / 1024:,.0f} KiB')
+
+            # Through the view under both servers: the first bytes arrive before
+            # the export finishes, and memory stays flat.
+            User.objects.create_superuser('bench-admin', password='bench')
+            client = Client()
+            client.login(username='bench-admin', password='bench')
+
+            def wsgi_download():
+                start = time.perf_counter()
+                response = client.get('/api/export/results', {'format': 'csv'})
+                first = None
+                total = 0
+                for chunk in response.streaming_content:
+                    first = first or time.perf_counter() - start
+                    total += len(chunk)
+                return first, time.perf_counter() - start, total
+
+            async def asgi_download():
+                async_client = AsyncClient()
+                async_client.cookies = client.cookies
+                start = time.perf_counter()
+                response = await async_client.get('/api/export/results', {'format': 'csv'})
+                first = None
+                total = 0
+                async for chunk in response.streaming_content:
+                    first = first or time.perf_counter() - start
+                    total += len(chunk)
+                return first, time.perf_counter() - start, total
+
+            for label, download in (('WSGI', wsgi_download), ('ASGI', lambda: asyncio.run(asgi_download()))):
+                first, elapsed, total = download()
+                tracemalloc.start()
+                download()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.stdout.write(f'{label} view: {total / 1e6:.1f} MB in {elapsed:.2f}s, first chunk after '
+                                  f'{first * 1000:.0f}ms, peak {peak / 1024:,.0f} KiB')
@@ -0,0 +1,86 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from OTS.answer_codec import pack_answers
+from OTS.models import Candidate, Question, Result
+from ots_common.bench import scratch_database
+from ._bench import fill_question_bank
+
+LEGACY_TABLE = 'bench_legacy_result'
+
+
+def database_bytes():
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA page_count')
+        pages = cursor.fetchone()[0]
+        cursor.execute('PRAGMA page_size')
+        return pages * cursor.fetchone()[0]
+
+
+class Command(BaseCommand):
+    help = 'Compare database size and write latency of packed result answers against the old details JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--results', type=int, default=5000)
+        parser.add_argument('-n', type=int, default=10, help='Questions per result')
+        parser.add_argument('--bank', type=int, default=1000, help='Question bank size')
+
+    def handle(self, *args, **options):
+        total, n = options['results'], options['n']
+        rng = random.Random(0)
+
+        with scratch_database(on_disk=True):
+            fill_question_bank(options['bank'])
+            Candidate.objects.create(username='bench', password='bench', name='Bench User')
+            bank = list(Question.objects.values_list('qid', 'version', 'que', 'a', 'b', 'c', 'd', 'ans'))
+            papers = []
+            for _ in range(total):
+                rows = []
+                for qid, version, que, a, b, c, d, ans in rng.sample(bank, n):
+                    user = rng.choice('ABCD-')
+                    rows.append((qid, version, que, {'A': a, 'B': b, 'C': c, 'D': d}, ans,
+                                 user, user == ans))
+                papers.append(rows)
+
+            with connection.cursor() as cursor:
+                cursor.execute(f'CREATE TABLE {LEGACY_TABLE} ('
+                               'resultid integer PRIMARY KEY AUTOINCREMENT, username varchar(20) NOT NULL, '
+                               'date date NOT NULL, time time NOT NULL, attempt integer NOT NULL, '
+                               'right integer NOT NULL, wrong integer NOT NULL, points real NOT NULL, '
+                               'details text NOT NULL)')
+
+            # Both sides use the same raw INSERT so only the payload differs.
+            def write_legacy(rows):
+                details = [{'qid': qid, 'question': que, 'options': options, 'correct': ans,
+                            'user': user, 'is_correct': ok}
+                           for qid, _, que, options, ans, user, ok in rows]
+                with connection.cursor() as cursor:
+                    cursor.execute(f'INSERT INTO {LEGACY_TABLE} '
+                                   '(username, date, time, attempt, right, wrong, points, details) '
+                                   "VALUES ('bench', date('now'), time('now'), %s, %s, %s, %s, %s)",
+                                   [n, 0, 0, 0.0, json.dumps(details)])
+
+            def write_packed(rows):
+                answers = pack_answers([(qid, version, '' if user == '-' else user, ans, ok)
+                                        for qid, version, _, _, ans, user, ok in rows])
+                with connection.cursor() as cursor:
+                    cursor.execute(f'INSERT INTO {Result._meta.db_table} '
+                                   '(username_id, date, time, attempt, right, wrong, points, answers) '
+                                   "VALUES ('bench', date('now'), time('now'), %s, %s, %s, %s, %s)",
+                                   [n, 0, 0, 0.0, answers])
+
+            for label, write in (('details JSON', write_legacy), ('packed answers', write_packed)):
+                before = database_bytes()
+                start = time.perf_counter()
+                for rows in papers:
+                    with transaction.atomic():
+                        write(rows)
+                elapsed = time.perf_counter() - start
+                growth = database_bytes() - before
+                self.stdout.write(f'{label:>15}: {growth / total:8.0f} bytes/result on disk, '
+                                  f'{growth / 1024 / 1024:6.2f} MiB for {total} results, '
+                                  f'{elapsed / total * 1e6:6.0f}us per write')
@@ -0,0 +1,46 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from OTS import sampling
+from OTS.models import Question
+from ots_common.bench import measure, scratch_database
+from ._bench import fill_question_bank, logged_in_client
+
+
+class Command(BaseCommand):
+    help = 'Benchmark test-paper sampling latency and peak memory as the question bank grows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000,1000000',
+                            help='Comma-separated question bank sizes')
+        parser.add_argument('-n', type=int, default=10, help='Questions per paper')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--legacy', action='store_true',
+                            help='Also time the old load-everything-and-shuffle approach')
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(s) for s in options['sizes'].split(','))
+        n = options['n']
+        repeat = options['repeat']
+
+        def legacy():
+            pool = list(Question.objects.all())
+            random.shuffle(pool)
+            return pool[:n]
+
+        with scratch_database():
+            client = logged_in_client()
+            self.stdout.write(f"{'bank':>9} {'sample ms':>10} {'sample KiB':>11} {'request ms':>11} {'request KiB':>12}"
+                              + (f" {'legacy ms':>10} {'legacy KiB':>11}" if options['legacy'] else ''))
+            for size in sizes:
+                fill_question_bank(size)
+                sampling.invalidate_question_ids()
+                sample_t, sample_mem = measure(lambda: sampling.sample_questions(n), repeat)
+                request_t, request_mem = measure(lambda: client.get('/test-paper', {'n': n}), repeat)
+                line = (f'{size:>9} {sample_t * 1000:>10.3f} {sample_mem / 1024:>11.1f} '
+                        f'{request_t * 1000:>11.3f} {request_mem / 1024:>12.1f}')
+                if options['legacy']:
+                    legacy_t, legacy_mem = measure(legacy, max(1, repeat // 5))
+                    line += f' {legacy_t * 1000:>10.3f} {legacy_mem / 1024:>11.1f}'
+                self.stdout.write(line)
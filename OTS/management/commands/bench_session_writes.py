@@ -0,0 +1,54 @@
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+
+from ots_common.bench import scratch_database
+from ._bench import WriteCounter, fill_question_bank, logged_in_client
+
+
+class Command(BaseCommand):
+    help = 'Count database writes during simulated exams, saving sessions on every request vs only on change'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidates', type=int, default=50)
+        parser.add_argument('--reloads', type=int, default=5,
+                            help='Test-paper reloads per candidate during the exam')
+        parser.add_argument('-n', type=int, default=10, help='Questions per paper')
+
+    def exam(self, username, n, reloads):
+        client = logged_in_client(username)
+        client.get('/home')
+        for _ in range(1 + reloads):
+            page = client.get(f'/test-paper?n={n}').content.decode()
+        qids = re.findall(r'name="qno(\d+)"', page)
+        answers = {f'qno{q}': q for q in qids}
+        answers.update({f'q{q}': 'A' for q in qids})
+        client.post('/calculate-result', answers)
+        client.get('/result')
+        client.get('/test-history')
+        client.get('/logout')
+
+    def handle(self, *args, **options):
+        before_middleware = [m for m in settings.MIDDLEWARE if m != 'OTS.middleware.SessionRefreshMiddleware']
+        modes = [
+            ('save every request', {'SESSION_SAVE_EVERY_REQUEST': True, 'MIDDLEWARE': before_middleware}),
+            ('save on change', {}),
+        ]
+        requests = options['candidates'] * (options['reloads'] + 7)
+
+        with scratch_database():
+            fill_question_bank(1000)
+            for mode, (label, overrides) in enumerate(modes):
+                cache.clear()
+                counter = WriteCounter()
+                with override_settings(**overrides), connection.execute_wrapper(counter):
+                    for i in range(options['candidates']):
+                        self.exam(f'exam{mode}-{i}', options['n'], options['reloads'])
+                total = sum(counter.by_table.values())
+                tables = ', '.join(f'{table}={count}' for table, count in counter.by_table.most_common())
+                self.stdout.write(f'{label:>18}: {total} writes for {requests} requests '
+                                  f'({total / requests:.2f}/request): {tables}')
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import override_settings
+
+from OTS.models import Candidate, Question, Result
+from OTS.stats import get_candidate_stats
+from ots_common.bench import measure, scratch_database
+from ._bench import fill_question_bank
+
+NO_FRAGMENT_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'template_fragments': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare full and fragment-cached rendering of test papers and the history page'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,50,200', help='Comma-separated paper lengths')
+        parser.add_argument('--history-rows', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options['sizes'].split(',')]
+        repeat = options['repeat']
+
+        with scratch_database():
+            fill_question_bank(max(sizes))
+            candidate = Candidate.objects.create(username='bench', password='bench', name='Bench User')
+            Result.objects.bulk_create([
+                Result(username=candidate, attempt=10, right=i % 10, wrong=10 - i % 10, points=float(i % 10))
+                for i in range(options['history_rows'])
+            ])
+            history = {
+                'candidate': candidate,
+                'results': list(Result.objects.filter(username=candidate).defer('answers')),
+                'next_cursor': None,
+                'stats': get_candidate_stats(candidate.username),
+            }
+            cases = [(f'{n}-question paper', 'paper_questions.html', {'questions': list(Question.objects.all()[:n])})
+                     for n in sizes]
+            cases.append((f'history ({options["history_rows"]} rows)', 'candidate_history.html', history))
+
+            for label, template, context in cases:
+                with override_settings(CACHES=NO_FRAGMENT_CACHE):
+                    full, _ = measure(lambda: render_to_string(template, context), repeat)
+                cached, _ = measure(lambda: render_to_string(template, context), repeat)
+                self.stdout.write(f'{label:>22}: full {full * 1000:7.2f}ms, '
+                                  f'cached fragments {cached * 1000:7.2f}ms ({full / cached:.1f}x)')
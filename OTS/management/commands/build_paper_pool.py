@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from OTS.models import PaperPoolEntry
+from OTS.paper_pool import fill_pool, pool_target
+
+
+class Command(BaseCommand):
+    help = 'Pre-build random test papers so exam starts are served from the paper pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lengths', help='Comma-separated paper lengths (default: OTS_PAPER_POOL_LENGTHS)')
+        parser.add_argument('--size', type=int, help='Papers to keep per length (default: OTS_PAPER_POOL_TARGET)')
+        parser.add_argument('--clear', action='store_true', help='Discard existing pooled papers first')
+
+    def handle(self, *args, **options):
+        if options['lengths']:
+            lengths = [int(n) for n in options['lengths'].split(',')]
+        else:
+            lengths = list(getattr(settings, 'OTS_PAPER_POOL_LENGTHS', (3, 5, 10)))
+        size = options['size'] if options['size'] is not None else pool_target()
+        if options['clear']:
+            PaperPoolEntry.objects.filter(n__in=lengths).delete()
+        for n in lengths:
+            added = fill_pool(n, size)
+            self.stdout.write(self.style.SUCCESS(f'{n}-question papers: added {added}, pool holds '
+                                                 f'{PaperPoolEntry.objects.filter(n=n).count()}.'))
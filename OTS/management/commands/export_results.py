@@ -0,0 +1,55 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from OTS.result_export import FORMATS, SOURCES, export_chunks, gzipped
+
+
+def _date(value):
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise CommandError(f'{value!r} is not a YYYY-MM-DD date')
+    return parsed
+
+
+class Command(BaseCommand):
+    help = 'Stream results to CSV or NDJSON without loading them into memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-o', '--output', help='File to write (default: stdout)')
+        parser.add_argument('--model', choices=sorted(SOURCES), default='OTS',
+                            help='Export OTS.Result (default) or ots_app.TestResult')
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--since', type=_date, help='First day to include (YYYY-MM-DD)')
+        parser.add_argument('--until', type=_date, help='Last day to include (YYYY-MM-DD)')
+        parser.add_argument('--candidate', help='Only this username')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output (implied by a .gz output path)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched per database round trip')
+
+    def handle(self, *args, **options):
+        try:
+            source = SOURCES[options['model']]()
+        except LookupError as exc:
+            raise CommandError(str(exc))
+        chunks = export_chunks(source, options['format'], chunk_size=options['chunk_size'],
+                               since=options['since'], until=options['until'], candidate=options['candidate'])
+        output = options['output']
+        if options['gzip'] or (output and output.endswith('.gz')):
+            out = open(output, 'wb') if output else sys.stdout.buffer
+            chunks = gzipped(chunks)
+        elif output:
+            out = open(output, 'w', encoding='utf-8', newline='')
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+        finally:
+            if output:
+                out.close()
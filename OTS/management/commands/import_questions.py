@@ -0,0 +1,73 @@
+import json
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from OTS.question_import import TARGETS, ImportProgress, import_rows, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Stream questions from a CSV or JSONL file into the question bank, skipping duplicates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='.csv file with a header row, or .jsonl with one object per line')
+        parser.add_argument('--model', choices=sorted(TARGETS), default='OTS',
+                            help='Import into OTS.Question (default) or ots_app.Question')
+        parser.add_argument('--chunk-size', type=int, default=20000, help='Rows per transaction')
+        parser.add_argument('--subject', help='ots_app only: subject for rows without a subject column')
+        parser.add_argument('--resume', action='store_true',
+                            help='Continue after the last committed chunk of an interrupted import')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist')
+        try:
+            target = TARGETS[options['model']](subject=options['subject'])
+        except LookupError as exc:
+            raise CommandError(str(exc))
+
+        # After each committed chunk the number of rows read so far is saved
+        # next to the file; --resume skips that many rows. The file must not
+        # have changed in between.
+        state_path = f'{path}.import-state'
+        stat = os.stat(path)
+        fingerprint = {'size': stat.st_size, 'mtime': stat.st_mtime, 'model': options['model']}
+        skip = 0
+        progress = ImportProgress()
+        if options['resume'] and os.path.exists(state_path):
+            with open(state_path) as fh:
+                state = json.load(fh)
+            if state['file'] != fingerprint:
+                raise CommandError(f'{path} changed since the interrupted import; run it again without --resume')
+            skip = progress.rows = state['rows']
+            progress.inserted, progress.duplicates, progress.invalid = state['inserted'], state['duplicates'], state['invalid']
+            self.stdout.write(f'Resuming after row {skip}.')
+
+        start = time.perf_counter()
+        reported = [start]
+
+        def chunk_committed(progress):
+            with open(state_path, 'w') as fh:
+                json.dump({'file': fingerprint, 'rows': progress.rows, 'inserted': progress.inserted,
+                           'duplicates': progress.duplicates, 'invalid': progress.invalid}, fh)
+            now = time.perf_counter()
+            if now - reported[0] >= 2:
+                reported[0] = now
+                rate = (progress.rows - skip) / (now - start)
+                self.stdout.write(f'{progress.rows} rows read, {progress.inserted} inserted ({rate:,.0f} rows/s)')
+
+        import_rows(islice(read_rows(path), skip, None), target, chunk_size=options['chunk_size'],
+                    progress=progress, on_chunk=chunk_committed)
+        if os.path.exists(state_path):
+            os.remove(state_path)
+
+        elapsed = time.perf_counter() - start
+        for error in progress.errors:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {progress.inserted} questions into {target.label} from {progress.rows} rows in {elapsed:.1f}s '
+            f'({(progress.rows - skip) / max(elapsed, 1e-9):,.0f} rows/s): '
+            f'{progress.duplicates} duplicates, {progress.invalid} invalid.'))
@@ -0,0 +1,181 @@
+import ast
+import json
+import random
+import re
+import threading
+import time
+import warnings
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.test import Client, override_settings
+
+from OTS.chat_providers import get_chat_provider
+from OTS.models import Candidate
+from OTS.paper_pool import fill_pool
+from ots_common.bench import percentile, scratch_database
+from ._bench import fill_question_bank
+
+VIEWS = ('login', 'home', 'test-paper', 'calculate-result', 'test-history', 'chatbot', 'api/chat',
+         'api/chat/stream')
+CHAT_MESSAGES = ('what is my score', 'show my mistakes', 'my progress', 'explain question {qid}')
+
+
+class QueryCounter:
+    """connection.execute_wrapper that counts every statement."""
+
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)  # view -> [(seconds, queries, ok)]
+
+    def add(self, view, seconds, queries, ok):
+        with self._lock:
+            self.samples[view].append((seconds, queries, ok))
+
+
+def _setting(text):
+    name, _, value = text.partition('=')
+    if not name or not _:
+        raise ValueError(text)
+    try:
+        return name, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return name, value
+
+
+class Command(BaseCommand):
+    help = ('Simulate concurrent candidates taking an exam through the real URLconf and report '
+            'throughput, latency percentiles and query counts per view')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidates', type=int, default=100, help='Exam sessions to run')
+        parser.add_argument('--concurrency', type=int, default=8, help='Candidates in flight at once (threads)')
+        parser.add_argument('-n', type=int, default=10, help='Questions per paper')
+        parser.add_argument('--bank', type=int, default=1000, help='Question bank size')
+        parser.add_argument('--chat-messages', type=int, default=2, choices=range(len(CHAT_MESSAGES) + 1),
+                            help='Chatbot messages each candidate sends after the test, to both chat endpoints')
+        parser.add_argument('--warmup', type=int, default=2, help='Unrecorded sessions run first')
+        parser.add_argument('--paper-pool', action='store_true', help='Pre-build the paper pool before the run')
+        parser.add_argument('--set', type=_setting, action='append', default=[], metavar='NAME=VALUE',
+                            help='Override a setting for the run (Python literal or string); repeatable')
+        parser.add_argument('--save', metavar='PATH', help='Write the report as JSON, e.g. as a baseline')
+        parser.add_argument('--baseline', metavar='PATH', help='Compare against a report saved with --save')
+
+    def exam(self, username, options, recorder):
+        client = Client()
+        rng = random.Random(username)
+
+        def call(view, method, path, data=None, expect=200, **extra):
+            counter = QueryCounter()
+            start = time.perf_counter()
+            with connection.execute_wrapper(counter):
+                response = getattr(client, method)(path, data, **extra)
+                if response.streaming:
+                    b''.join(response)  # the reply is only produced as it is read
+            recorder.add(view, time.perf_counter() - start, counter.queries, response.status_code == expect)
+            return response
+
+        try:
+            call('login', 'post', '/login', {'username': username, 'password': 'load'}, expect=302)
+            call('home', 'get', '/home')
+            page = call('test-paper', 'get', '/test-paper', {'n': options['n']}).content.decode()
+            qids = re.findall(r'name="qno(\d+)"', page)
+            answers = {f'qno{qid}': qid for qid in qids}
+            answers.update({f'q{qid}': rng.choice('ABCD') for qid in qids if rng.random() < 0.9})
+            call('calculate-result', 'post', '/calculate-result', answers, expect=302)
+            call('test-history', 'get', '/test-history')
+            call('chatbot', 'get', '/chatbot')
+            for message in CHAT_MESSAGES[:options['chat_messages']]:
+                body = json.dumps({'message': message.format(qid=qids[0] if qids else 1)})
+                call('api/chat', 'post', '/api/chat', body, content_type='application/json')
+                call('api/chat/stream', 'post', '/api/chat/stream', body, content_type='application/json')
+        finally:
+            close_old_connections()
+
+    def handle(self, *args, **options):
+        # The test client reads the async chat stream synchronously, which is fine here.
+        warnings.filterwarnings('ignore', message='StreamingHttpResponse must consume asynchronous iterators')
+        overrides = dict(options['set'])
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as fh:
+                baseline = json.load(fh)
+
+        with override_settings(**overrides):
+            provider = get_chat_provider()
+            if provider is not None and provider.name != 'fake':
+                raise CommandError('The load test must not call a real LLM: unset OPENAI_API_KEY or pass '
+                                   '--set OTS_CHAT_PROVIDER=fake')
+            with scratch_database(on_disk=True):
+                fill_question_bank(options['bank'])
+                if options['paper_pool']:
+                    fill_pool(options['n'])
+                total = options['warmup'] + options['candidates']
+                Candidate.objects.bulk_create([Candidate(username=f'load{i}', password='load', name=f'Load {i}')
+                                               for i in range(total)])
+                for i in range(options['warmup']):
+                    self.exam(f'load{i}', options, Recorder())
+
+                recorder = Recorder()
+                usernames = [f'load{i}' for i in range(options['warmup'], total)]
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                    list(pool.map(lambda username: self.exam(username, options, recorder), usernames))
+                elapsed = time.perf_counter() - start
+
+        report = {
+            'candidates': options['candidates'], 'concurrency': options['concurrency'], 'n': options['n'],
+            'settings': {name: repr(value) for name, value in overrides.items()},
+            'seconds': round(elapsed, 3), 'views': {},
+        }
+        for view in VIEWS:
+            samples = recorder.samples.get(view)
+            if not samples:
+                continue
+            latencies = sorted(seconds for seconds, _, _ in samples)
+            queries = [count for _, count, _ in samples]
+            report['views'][view] = {
+                'requests': len(samples),
+                'errors': sum(1 for _, _, ok in samples if not ok),
+                'rps': round(len(samples) / elapsed, 1),
+                'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+                'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+                'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+                'queries': round(sum(queries) / len(queries), 2),
+                'max_queries': max(queries),
+            }
+        self.print_report(report, baseline)
+        if options['save']:
+            with open(options['save'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+        if any(stats['errors'] for stats in report['views'].values()):
+            raise CommandError('Some requests failed; see the errors column.')
+
+    def print_report(self, report, baseline):
+        requests = sum(stats['requests'] for stats in report['views'].values())
+        self.stdout.write(f"{report['candidates']} candidates, {report['concurrency']} at a time, "
+                          f"{report['n']}-question papers: {requests} requests in {report['seconds']:.2f}s "
+                          f"({requests / report['seconds']:.0f} req/s, "
+                          f"{report['candidates'] / report['seconds']:.1f} exams/s)")
+        header = f"{'view':<17}{'requests':>9}{'errors':>7}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}" \
+                 f"{'queries':>9}"
+        self.stdout.write(header + ('   vs baseline (p95, queries)' if baseline else ''))
+        for view, stats in report['views'].items():
+            line = (f"{view:<17}{stats['requests']:>9}{stats['errors']:>7}{stats['rps']:>8.1f}"
+                    f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['queries']:>9.1f}")
+            before = baseline['views'].get(view) if baseline else None
+            if before:
+                change = (stats['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0.0
+                line += f"   {change:+6.1f}%  {stats['queries'] - before['queries']:+.1f}"
+            self.stdout.write(line)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from OTS.stats import rebuild_candidate_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-candidate statistics from stored results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help='Only rebuild this candidate')
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_candidate_stats(options['username'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {rebuilt} candidate(s).'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from OTS.leaderboard import rebuild_leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Recount the leaderboard histogram from candidate statistics'
+
+    def handle(self, *args, **options):
+        ranked = rebuild_leaderboard()
+        self.stdout.write(self.style.SUCCESS(f'Leaderboard rebuilt with {ranked} ranked candidate(s).'))
@@ -0,0 +1,32 @@
+"""
+Metrics only the OTS app records, in the shared registry (ots_common.metrics).
+"""
+import time
+
+from django.apps import apps
+from django.db.models import F
+
+from OTS.models import ExamTimer
+from ots_common.metrics import REGISTRY
+
+CHAT_REQUESTS = REGISTRY.counter('ots_chat_requests_total', 'Chatbot messages received', ['endpoint'])
+CHAT_PROVIDER_SECONDS = REGISTRY.histogram(
+    'ots_chat_provider_seconds', 'LLM provider time for a full reply', ['endpoint', 'provider'])
+CHAT_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    'ots_chat_first_token_seconds', 'LLM provider time to the first streamed token', ['provider'])
+CHAT_PROVIDER_ERRORS = REGISTRY.counter(
+    'ots_chat_provider_errors_total', 'LLM provider calls that failed (rule-based reply sent instead)',
+    ['endpoint', 'provider'])
+CHAT_STREAMS_OPEN = REGISTRY.gauge('ots_chat_streams_open', 'Chatbot replies currently streaming')
+
+
+def _tests_in_progress():
+    running = (ExamTimer.objects.filter(finished=False)
+               .alias(ends=F('start_ts') + F('duration_sec')).filter(ends__gt=int(time.time())).count())
+    if apps.is_installed('ots_app'):
+        running += apps.get_model('ots_app', 'Test').objects.filter(status='in-progress').count()
+    return running
+
+
+REGISTRY.gauge_function('ots_tests_in_progress', 'Tests started and not yet submitted or expired',
+                        _tests_in_progress)
@@ -0,0 +1,98 @@
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+from OTS import request_metrics
+
+request_log = logging.getLogger('OTS.requests')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class SessionRefreshMiddleware(MiddlewareMixin):
+    """
+    Keep logged-in sessions alive without saving them on every request.
+
+    Marking the session modified makes SessionMiddleware save it with a fresh
+    expiry. That happens at most once every OTS_SESSION_REFRESH_SECONDS per
+    candidate, instead of on every page view.
+    """
+
+    def process_response(self, request, response):
+        session = getattr(request, 'session', None)
+        if session is not None and session.get('username'):
+            now = int(time.time())
+            if now - session.get('refreshed_at', 0) >= getattr(settings, 'OTS_SESSION_REFRESH_SECONDS', 300):
+                session['refreshed_at'] = now
+        return response
+
+
+class RequestTimingMiddleware:
+    """
+    Report query count, DB time, template time and total time per request.
+
+    The numbers go out as a ``Server-Timing`` header (OTS_SERVER_TIMING) and
+    as one JSON log line on the ``OTS.requests`` logger. A view that runs more
+    queries than its entry in OTS_QUERY_BUDGETS (keyed by URL name, e.g.
+    ``'OTS:home'``) is logged as a warning, or raises QueryBudgetExceeded
+    when OTS_QUERY_BUDGET_STRICT is set, as in tests. Keep it first in
+    MIDDLEWARE so the total covers the other middleware too. For streaming
+    responses the total stops when streaming starts.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        request_metrics.install()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, token = request_metrics.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_metrics.stop(token)
+        return self.report(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics, token = request_metrics.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_metrics.stop(token)
+        return self.report(request, response, metrics)
+
+    def report(self, request, response, metrics):
+        total = metrics.total_seconds
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else ''
+        record = {
+            'method': request.method, 'path': request.path, 'view': view, 'status': response.status_code,
+            'queries': metrics.queries, 'db_ms': round(metrics.db_seconds * 1000, 2),
+            'template_ms': round(metrics.template_seconds * 1000, 2), 'total_ms': round(total * 1000, 2),
+        }
+        if getattr(settings, 'OTS_SERVER_TIMING', True):
+            response['Server-Timing'] = (
+                f'db;dur={metrics.db_seconds * 1000:.2f};desc="{metrics.queries} queries", '
+                f'tpl;dur={metrics.template_seconds * 1000:.2f};desc="templates", '
+                f'total;dur={total * 1000:.2f}'
+            )
+        budget = getattr(settings, 'OTS_QUERY_BUDGETS', {}).get(view)
+        if budget is not None and metrics.queries > budget:
+            if getattr(settings, 'OTS_QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(f'{view} ran {metrics.queries} queries, over its budget of {budget}')
+            record['query_budget'] = budget
+            request_log.warning(json.dumps(record))
+        elif request_log.isEnabledFor(logging.INFO):
+            request_log.info(json.dumps(record))
+        return response
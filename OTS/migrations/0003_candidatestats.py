@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OTS', '0002_cacheversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateStats',
+            fields=[
+                ('candidate', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='OTS.candidate')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('points_sum', models.FloatField(default=0.0)),
+                ('best_points', models.FloatField(blank=True, null=True)),
+                ('last_attempt', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
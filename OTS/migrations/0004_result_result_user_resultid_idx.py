@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OTS', '0003_candidatestats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['username', 'resultid'], name='result_user_resultid_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OTS', '0004_result_result_user_resultid_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidatestats',
+            name='last_points',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='candidatestats',
+            name='recent_points',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='candidatestats',
+            name='streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='candidatestats',
+            name='worst_points',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,153 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:44
+
+import struct
+
+from django.db import migrations, models
+
+TEXT_FIELDS = ('que', 'a', 'b', 'c', 'd')
+
+# Frozen copy of the OTS.answer_codec format this migration writes.
+_RECORD = struct.Struct('<qIB')
+_OPTIONS = ('', 'A', 'B', 'C', 'D')
+_OPTION_CODES = {opt: code for code, opt in enumerate(_OPTIONS) if opt}
+
+
+def pack_answers(items) -> bytes:
+    out = bytearray()
+    for qid, version, user, correct, is_correct in items:
+        flags = _OPTION_CODES.get(user, 0) | (_OPTION_CODES.get(correct, 0) << 3) | (bool(is_correct) << 6)
+        out += _RECORD.pack(qid, version, flags)
+    return bytes(out)
+
+
+def unpack_answers(blob) -> list:
+    if not blob:
+        return []
+    return [
+        (qid, version, _OPTIONS[flags & 7], _OPTIONS[(flags >> 3) & 7], bool(flags & 64))
+        for qid, version, flags in _RECORD.iter_unpack(bytes(blob))
+    ]
+
+
+def _legacy_content(detail):
+    options = detail.get('options') or {}
+    return (detail.get('question') or '', options.get('A', ''), options.get('B', ''),
+            options.get('C', ''), options.get('D', ''))
+
+
+def pack_legacy_details(apps, schema_editor):
+    """
+    Convert Result.details JSON into packed answers.
+
+    Question text recorded in a result that no longer matches the bank (or
+    whose question was deleted) becomes a QuestionSnapshot; the bank question
+    then moves to the version after its snapshots.
+    """
+    Question = apps.get_model('OTS', 'Question')
+    QuestionSnapshot = apps.get_model('OTS', 'QuestionSnapshot')
+    Result = apps.get_model('OTS', 'Result')
+
+    bank = {row[0]: row[1:] for row in Question.objects.values_list('qid', *TEXT_FIELDS).iterator()}
+    results = Result.objects.only('resultid', 'details').order_by('resultid')
+
+    # Pass 1: number every outdated content per qid, oldest first.
+    legacy = {}
+    for result in results.iterator(chunk_size=500):
+        for detail in result.details or []:
+            qid = detail.get('qid')
+            content = _legacy_content(detail)
+            if bank.get(qid) != content:
+                versions = legacy.setdefault(qid, {})
+                if content not in versions:
+                    versions[content] = (len(versions) + 1, (detail.get('correct') or '')[:2])
+
+    for qid, versions in legacy.items():
+        QuestionSnapshot.objects.bulk_create([
+            QuestionSnapshot(qid=qid, version=version, ans=ans, **dict(zip(TEXT_FIELDS, content)))
+            for content, (version, ans) in versions.items()
+        ])
+        if qid in bank:
+            Question.objects.filter(qid=qid).update(version=len(versions) + 1)
+
+    # Pass 2: pack each result against the version it was graded on.
+    for result in results.iterator(chunk_size=500):
+        items = []
+        for detail in result.details or []:
+            qid = detail.get('qid')
+            if qid is None:
+                continue
+            content = _legacy_content(detail)
+            versions = legacy.get(qid, {})
+            version = versions[content][0] if content in versions else len(versions) + 1
+            user = detail.get('user') or ''
+            items.append((qid, version, '' if user == '-' else user, detail.get('correct') or '',
+                          detail.get('is_correct')))
+        Result.objects.filter(resultid=result.resultid).update(answers=pack_answers(items))
+
+
+def unpack_to_legacy_details(apps, schema_editor):
+    Question = apps.get_model('OTS', 'Question')
+    QuestionSnapshot = apps.get_model('OTS', 'QuestionSnapshot')
+    Result = apps.get_model('OTS', 'Result')
+
+    content = {(row[0], row[1]): row[2:] for row in Question.objects.values_list('qid', 'version', *TEXT_FIELDS)}
+    content.update({
+        (row[0], row[1]): row[2:] for row in QuestionSnapshot.objects.values_list('qid', 'version', *TEXT_FIELDS)
+    })
+    for result in Result.objects.only('resultid', 'answers').iterator(chunk_size=500):
+        details = []
+        for qid, version, user, correct, is_correct in unpack_answers(result.answers):
+            que, a, b, c, d = content.get((qid, version), ('', '', '', '', ''))
+            details.append({
+                'qid': qid,
+                'question': que,
+                'options': {'A': a, 'B': b, 'C': c, 'D': d},
+                'correct': correct,
+                'user': user or '-',
+                'is_correct': is_correct
+            })
+        Result.objects.filter(resultid=result.resultid).update(details=details)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OTS', '0005_candidatestats_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('qid', models.BigIntegerField()),
+                ('version', models.PositiveIntegerField()),
+                ('que', models.TextField()),
+                ('a', models.CharField(max_length=255)),
+                ('b', models.CharField(max_length=255)),
+                ('c', models.CharField(max_length=255)),
+                ('d', models.CharField(max_length=255)),
+                ('ans', models.CharField(max_length=2)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='result',
+            name='answers',
+            field=models.BinaryField(blank=True, default=bytes),
+        ),
+        migrations.AddConstraint(
+            model_name='questionsnapshot',
+            constraint=models.UniqueConstraint(fields=('qid', 'version'), name='question_snapshot_qid_version'),
+        ),
+        migrations.RunPython(pack_legacy_details, unpack_to_legacy_details),
+        migrations.RemoveField(
+            model_name='result',
+            name='details',
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OTS', '0006_compact_result_answers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaperPoolEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('n', models.PositiveSmallIntegerField()),
+                ('qids', models.BinaryField()),
+                ('html', models.TextField()),
+                ('claimed_by', models.CharField(blank=True, default='', max_length=32)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['n', 'claimed_by', 'id'], name='paper_pool_unclaimed_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OTS', '0007_paperpoolentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamTimer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('n', models.PositiveSmallIntegerField()),
+                ('start_ts', models.PositiveBigIntegerField()),
+                ('duration_sec', models.PositiveIntegerField()),
+                ('finished', models.BooleanField(default=False)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_timers', to='OTS.candidate')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['candidate', 'finished', 'id'], name='exam_timer_open_idx')],
+            },
+        ),
+    ]
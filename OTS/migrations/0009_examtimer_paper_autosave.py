@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OTS', '0008_examtimer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examtimer',
+            name='qids',
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.AddField(
+            model_name='examtimer',
+            name='saved_answers',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
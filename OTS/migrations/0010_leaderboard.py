@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:55
+
+from collections import Counter
+
+from django.db import migrations, models
+
+# Frozen copy of OTS.leaderboard.bucket as of this migration.
+SCALE = 100
+MIN_BUCKET, MAX_BUCKET = -10 * SCALE, 10 * SCALE
+
+
+def bucket(score: float) -> int:
+    return min(MAX_BUCKET, max(MIN_BUCKET, round(score * SCALE)))
+
+
+def count_existing_scores(apps, schema_editor):
+    CandidateStats = apps.get_model('OTS', 'CandidateStats')
+    LeaderboardBucket = apps.get_model('OTS', 'LeaderboardBucket')
+    counts = Counter()
+    rows = CandidateStats.objects.filter(attempts__gt=0).values_list('points_sum', 'attempts')
+    for points_sum, attempts in rows.iterator(chunk_size=10000):
+        counts[bucket(points_sum / attempts)] += 1
+    LeaderboardBucket.objects.bulk_create(
+        [LeaderboardBucket(score=score, candidates=count) for score, count in counts.items()], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OTS', '0009_examtimer_paper_autosave'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardBucket',
+            fields=[
+                ('score', models.IntegerField(primary_key=True, serialize=False)),
+                ('candidates', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='points',
+            field=models.FloatField(db_index=True, default=0.0),
+        ),
+        migrations.RunPython(count_existing_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OTS', '0010_leaderboard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemAnalysisRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('results', models.PositiveIntegerField()),
+                ('responses', models.PositiveBigIntegerField()),
+                ('kr20', models.FloatField(help_text='KR-20 pooled over paper lengths, weighted by results', null=True)),
+                ('kr20_by_length', models.JSONField(default=dict)),
+                ('seconds', models.FloatField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuestionAnalysis',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='analysis', serialize=False, to='OTS.question')),
+                ('version', models.PositiveIntegerField()),
+                ('responses', models.PositiveIntegerField()),
+                ('difficulty', models.FloatField(help_text='Share of responses answered correctly (p-value)')),
+                ('discrimination', models.FloatField(help_text='Point-biserial correlation with the score on the rest of the paper', null=True)),
+                ('rate_a', models.FloatField()),
+                ('rate_b', models.FloatField()),
+                ('rate_c', models.FloatField()),
+                ('rate_d', models.FloatField()),
+                ('skip_rate', models.FloatField()),
+                ('analyzed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
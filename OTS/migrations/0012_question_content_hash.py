@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:03
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def content_hash(question, a, b, c, d, answer) -> str:
+    """Frozen copy of ots_common.questions.content_hash as of this migration."""
+    parts = [' '.join(str(value).split()).casefold() for value in (question, a, b, c, d, answer)]
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def hash_existing_questions(apps, schema_editor):
+    Question = apps.get_model('OTS', 'Question')
+    batch = []
+    for question in Question.objects.only('qid', 'que', 'a', 'b', 'c', 'd', 'ans').iterator(chunk_size=5000):
+        question.content_hash = content_hash(question.que, question.a, question.b, question.c, question.d,
+                                             question.ans)
+        batch.append(question)
+        if len(batch) >= 5000:
+            Question.objects.bulk_update(batch, ['content_hash'])
+            batch = []
+    Question.objects.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OTS', '0011_item_analysis'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+        migrations.RunPython(hash_existing_questions, migrations.RunPython.noop),
+    ]
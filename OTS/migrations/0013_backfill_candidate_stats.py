@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from django.db import migrations
+from django.utils import timezone
+
+# The backfill is frozen here rather than importing OTS.stats, so later
+# changes to the live models and helpers cannot break this migration.
+RECENT_WINDOW = 10
+
+
+def _combine(date, time):
+    moment = datetime.combine(date, time)
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+def backfill_candidate_stats(apps, schema_editor):
+    """
+    CandidateStats was created empty; fill it (and the Candidate summary
+    columns it must agree with) from the results already stored.
+    """
+    Candidate = apps.get_model('OTS', 'Candidate')
+    CandidateStats = apps.get_model('OTS', 'CandidateStats')
+    Result = apps.get_model('OTS', 'Result')
+
+    scores = {}
+    last_attempt = {}
+    rows = Result.objects.order_by('username_id', 'resultid').values_list('username_id', 'points', 'date', 'time')
+    for candidate_id, points, date, time in rows.iterator(chunk_size=2000):
+        scores.setdefault(candidate_id, []).append(points)
+        last_attempt[candidate_id] = (date, time)
+
+    for candidate_id in Candidate.objects.values_list('username', flat=True).iterator():
+        points = scores.get(candidate_id, [])
+        streak = 0
+        for previous, current in zip(points, points[1:]):
+            streak = streak + 1 if current > previous else 0
+        CandidateStats.objects.update_or_create(candidate_id=candidate_id, defaults={
+            'attempts': len(points),
+            'points_sum': sum(points, 0.0),
+            'best_points': max(points, default=None),
+            'worst_points': min(points, default=None),
+            'last_points': points[-1] if points else None,
+            'streak': streak,
+            'recent_points': points[-RECENT_WINDOW:],
+            'last_attempt': _combine(*last_attempt[candidate_id]) if points else None,
+        })
+        Candidate.objects.filter(username=candidate_id).update(
+            test_attempted=len(points), points=sum(points, 0.0) / len(points) if points else 0.0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OTS', '0012_question_content_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_candidate_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:48
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import F
+
+# Frozen copy of OTS.leaderboard.bucket as of this migration.
+SCALE = 100
+MIN_BUCKET, MAX_BUCKET = -10 * SCALE, 10 * SCALE
+
+
+def bucket(score: float) -> int:
+    return min(MAX_BUCKET, max(MIN_BUCKET, round(score * SCALE)))
+
+
+def fill_averages_and_recount(apps, schema_editor):
+    """
+    Store each candidate's average and recount the leaderboard from it.
+    0010 counted buckets while CandidateStats was still empty (filled in
+    0013), so upgraded databases had no ranked candidates.
+    """
+    CandidateStats = apps.get_model('OTS', 'CandidateStats')
+    LeaderboardBucket = apps.get_model('OTS', 'LeaderboardBucket')
+    CandidateStats.objects.filter(attempts__gt=0).update(average_points=F('points_sum') / F('attempts'))
+    counts = Counter()
+    rows = CandidateStats.objects.filter(attempts__gt=0).values_list('average_points', flat=True)
+    for average in rows.iterator(chunk_size=10000):
+        counts[bucket(average)] += 1
+    LeaderboardBucket.objects.all().delete()
+    LeaderboardBucket.objects.bulk_create(
+        [LeaderboardBucket(score=score, candidates=count) for score, count in counts.items()], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OTS', '0013_backfill_candidate_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidatestats',
+            name='average_points',
+            field=models.FloatField(db_index=True, default=0.0),
+        ),
+        migrations.RunPython(fill_averages_and_recount, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('OTS', '0014_candidatestats_average_points'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='candidate',
+            name='points',
+            field=models.FloatField(default=0.0),
+        ),
+    ]
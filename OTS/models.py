@@ -1,5 +1,7 @@
 from django.db import models
 
+from OTS.answer_codec import unpack_answers
+
 class Candidate(models.Model):
     username = models.CharField(primary_key=True, max_length=20)
     password = models.CharField(null=False, max_length=20)
@@ -11,6 +13,31 @@ class Candidate(models.Model):
         return f"{self.name} ({self.username})"
 
 
+class CandidateStats(models.Model):
+    # Aggregates updated with one atomic UPDATE per submission (see OTS.stats);
+    # rebuild from Result with ``manage.py rebuild_candidate_stats``.
+    candidate = models.OneToOneField(Candidate, primary_key=True, on_delete=models.CASCADE, related_name='stats')
+    attempts = models.PositiveIntegerField(default=0)
+    points_sum = models.FloatField(default=0.0)
+    best_points = models.FloatField(null=True, blank=True)
+    worst_points = models.FloatField(null=True, blank=True)
+    last_points = models.FloatField(null=True, blank=True)
+    # Consecutive attempts that each scored higher than the one before.
+    streak = models.PositiveIntegerField(default=0)
+    # Points of the most recent attempts, oldest first (see ots_common.rollups.RECENT_WINDOW).
+    recent_points = models.JSONField(default=list, blank=True)
+    last_attempt = models.DateTimeField(null=True, blank=True)
+    # points_sum / attempts, stored so the leaderboard's top list reads an index.
+    average_points = models.FloatField(default=0.0, db_index=True)
+
+    @property
+    def recent_average(self):
+        return sum(self.recent_points) / len(self.recent_points) if self.recent_points else 0.0
+
+    def __str__(self):
+        return f"Stats for {self.candidate_id} ({self.attempts} attempts)"
+
+
 class Question(models.Model):
     qid = models.BigAutoField(primary_key=True, auto_created=True)
     que = models.TextField()
@@ -19,11 +46,38 @@ class Question(models.Model):
     c = models.CharField(max_length=255)
     d = models.CharField(max_length=255)
     ans = models.CharField(max_length=2)  # expected values: 'A'|'B'|'C'|'D'
+    # Bumped whenever the text or answer changes; the previous content is
+    # kept as a QuestionSnapshot so old results still show what was asked.
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # sha1 of the normalized content (OTS.question_import.content_hash), used
+    # to skip questions that are already in the bank when importing.
+    content_hash = models.CharField(max_length=40, blank=True, editable=False)
 
     def __str__(self):
         return f"Q{self.qid}: {self.que[:50]}..."
 
 
+class QuestionSnapshot(models.Model):
+    # Content of a question as it was at ``version`` before an edit or delete.
+    qid = models.BigIntegerField()
+    version = models.PositiveIntegerField()
+    que = models.TextField()
+    a = models.CharField(max_length=255)
+    b = models.CharField(max_length=255)
+    c = models.CharField(max_length=255)
+    d = models.CharField(max_length=255)
+    ans = models.CharField(max_length=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['qid', 'version'], name='question_snapshot_qid_version'),
+        ]
+
+    def __str__(self):
+        return f"Q{self.qid} v{self.version}: {self.que[:50]}..."
+
+
 class Result(models.Model):
     resultid = models.BigAutoField(primary_key=True, auto_created=True)
     username = models.ForeignKey(Candidate, on_delete=models.CASCADE)
@@ -33,15 +87,62 @@ class Result(models.Model):
     right = models.IntegerField()
     wrong = models.IntegerField()
     points = models.FloatField()
-    # New: per-question details used for review and chatbot
-    # Each item: { qid, question, options: {A,B,C,D}, correct, user, is_correct }
-    details = models.JSONField(default=list, blank=True)
+    # Packed (qid, question version, chosen, correct, is_correct) per question;
+    # see OTS.answer_codec. Read it through ``details``.
+    answers = models.BinaryField(default=bytes, blank=True)
 
     def __str__(self):
         return f"{self.username.name} - {self.date} - {self.points} points"
 
+    @property
+    def details(self):
+        """
+        Per-question review rows used by the detail page and chatbot:
+        { qid, question, options: {A,B,C,D}, correct, correct_text, user,
+        user_text, is_correct }. Built on first access from the question bank,
+        or from snapshots for questions edited since, then cached.
+        """
+        if not hasattr(self, '_details'):
+            self._details = self._build_details()
+        return self._details
+
+    def _build_details(self):
+        items = unpack_answers(self.answers)
+        if not items:
+            return []
+        fields = ('qid', 'version', 'que', 'a', 'b', 'c', 'd')
+        qids = {item[0] for item in items}
+        content = {
+            (row['qid'], row['version']): row
+            for row in Question.objects.filter(qid__in=qids).values(*fields)
+        }
+        missing = {(qid, version) for qid, version, *_ in items if (qid, version) not in content}
+        if missing:
+            snapshots = QuestionSnapshot.objects.filter(qid__in={qid for qid, _ in missing}).values(*fields)
+            content.update({(row['qid'], row['version']): row for row in snapshots})
+
+        details = []
+        for qid, version, user, correct, is_correct in items:
+            row = content.get((qid, version), {})
+            options = {'A': row.get('a', ''), 'B': row.get('b', ''), 'C': row.get('c', ''), 'D': row.get('d', '')}
+            details.append({
+                'qid': qid,
+                'question': row.get('que', '(question no longer available)'),
+                'options': options,
+                'correct': correct,
+                'correct_text': options.get(correct, ''),
+                'user': user or '-',
+                'user_text': options.get(user, ''),
+                'is_correct': is_correct
+            })
+        return details
+
     class Meta:
         ordering = ['-resultid']
+        indexes = [
+            # Keyset pagination of a candidate's history walks this index.
+            models.Index(fields=['username', 'resultid'], name='result_user_resultid_idx'),
+        ]
 
 
 class TestConfig(models.Model):
@@ -69,3 +170,89 @@ class TestConfig(models.Model):
 
     def __str__(self):
         return f"Test Time Rules (short={self.minutes_short}m, medium={self.minutes_medium}m, long={self.minutes_long}m)"
+
+
+class CacheVersion(models.Model):
+    # Version counters for process-local caches; bumping one makes every
+    # worker reload the matching cache on its next check.
+    name = models.CharField(primary_key=True, max_length=50)
+    version = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class PaperPoolEntry(models.Model):
+    # A pre-built random paper waiting to be handed out; see OTS.paper_pool.
+    n = models.PositiveSmallIntegerField()
+    qids = models.BinaryField()
+    html = models.TextField()
+    # Set by the worker process claiming this paper, just before it is removed.
+    claimed_by = models.CharField(max_length=32, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['n', 'claimed_by', 'id'], name='paper_pool_unclaimed_idx')]
+
+    def __str__(self):
+        return f"Pooled paper #{self.pk} ({self.n} questions)"
+
+
+class ExamTimer(models.Model):
+    # One row per started test (the id is the attempt); see OTS.exam_timer.
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='exam_timers')
+    n = models.PositiveSmallIntegerField()
+    start_ts = models.PositiveBigIntegerField()
+    duration_sec = models.PositiveIntegerField()
+    # Packed int64 qids of the paper, so a reload shows the same questions.
+    qids = models.BinaryField(default=bytes)
+    # {qid: option} flushed by OTS.autosave.
+    saved_answers = models.JSONField(default=dict, blank=True)
+    finished = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [models.Index(fields=['candidate', 'finished', 'id'], name='exam_timer_open_idx')]
+
+    def __str__(self):
+        return f"{self.candidate_id} attempt {self.pk} ({self.n} questions)"
+
+
+class LeaderboardBucket(models.Model):
+    # Candidates whose average points round to score / 100; see OTS.leaderboard.
+    score = models.IntegerField(primary_key=True)
+    candidates = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.score / 100:.2f}: {self.candidates} candidate(s)"
+
+
+class QuestionAnalysis(models.Model):
+    # Item statistics written by ``manage.py analyze_items``; see OTS.item_analysis.
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name='analysis')
+    version = models.PositiveIntegerField()
+    responses = models.PositiveIntegerField()
+    difficulty = models.FloatField(help_text="Share of responses answered correctly (p-value)")
+    discrimination = models.FloatField(
+        null=True, help_text="Point-biserial correlation with the score on the rest of the paper")
+    rate_a = models.FloatField()
+    rate_b = models.FloatField()
+    rate_c = models.FloatField()
+    rate_d = models.FloatField()
+    skip_rate = models.FloatField()
+    analyzed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Q{self.question_id} v{self.version}: p={self.difficulty:.2f}"
+
+
+class ItemAnalysisRun(models.Model):
+    # One row per ``manage.py analyze_items`` run, with bank-level reliability.
+    created_at = models.DateTimeField(auto_now_add=True)
+    results = models.PositiveIntegerField()
+    responses = models.PositiveBigIntegerField()
+    kr20 = models.FloatField(null=True, help_text="KR-20 pooled over paper lengths, weighted by results")
+    kr20_by_length = models.JSONField(default=dict)
+    seconds = models.FloatField()
+
+    def __str__(self):
+        return f"Item analysis {self.created_at:%Y-%m-%d %H:%M} ({self.responses} responses)"
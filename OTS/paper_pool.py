@@ -0,0 +1,186 @@
+"""
+Pool of pre-built test papers for when a whole cohort starts at once.
+
+Each PaperPoolEntry holds one random paper of ``n`` questions as a packed qid
+array plus its question markup, already rendered from ``paper_questions.html``.
+A worker process claims CLAIM_BATCH papers with a single UPDATE and removes
+them from the table in the same transaction, so a worker that dies midway
+leaves them in the pool, and then hands them out from memory, so ``take_paper`` needs no
+sampling, rendering or queries for most requests.
+
+``manage.py build_paper_pool`` fills the pool ahead of an exam. After that, a
+length that drops below OTS_PAPER_POOL_LOW_WATER is topped back up to
+OTS_PAPER_POOL_TARGET by a background thread. Changing a question's content
+or deleting it discards the pool and bumps the ``paper_pool`` version, so
+other processes drop the papers they hold within VERSION_CHECK_SECONDS
+(OTS.versions); a transaction that changes many questions discards it once.
+The refill waits until such changes have paused for
+REFILL_DELAY_SECONDS, so a bulk edit triggers one refill rather than one per
+question. ``testPaper`` samples live until the refill lands.
+"""
+import random
+import threading
+import uuid
+from array import array
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Subquery
+from django.template.loader import render_to_string
+
+from OTS.models import PaperPoolEntry, Question
+from OTS.sampling import question_ids
+from OTS.versions import VersionedCache, bump_version
+
+POOL_VERSION = 'paper_pool'
+CLAIM_BATCH = 25
+REFILL_DELAY_SECONDS = 2.0
+
+_lock = threading.Lock()
+# n -> claimed papers not handed out yet; emptied when the pool version moves.
+_held = VersionedCache(POOL_VERSION, lambda version: {})
+
+_refill_lock = threading.Lock()
+_refilling = set()
+_pending_refills = set()
+_refill_timer = None
+
+
+def pool_target() -> int:
+    return getattr(settings, 'OTS_PAPER_POOL_TARGET', 300)
+
+
+def pool_low_water() -> int:
+    return getattr(settings, 'OTS_PAPER_POOL_LOW_WATER', 100)
+
+
+class PooledPaper:
+    def __init__(self, qids, html):
+        self.qids = qids
+        self.html = html
+
+
+def build_papers(n: int, count: int) -> int:
+    """Add ``count`` new random papers of ``n`` questions; returns how many."""
+    qids = question_ids()
+    k = max(0, min(n, len(qids)))
+    if not k or count <= 0:
+        return 0
+    picks = [random.sample(qids, k) for _ in range(count)]
+    by_id = Question.objects.in_bulk({qid for pick in picks for qid in pick})
+    entries = []
+    for pick in picks:
+        questions = [by_id[qid] for qid in pick if qid in by_id]
+        entries.append(PaperPoolEntry(
+            n=n,
+            qids=array('q', (q.qid for q in questions)).tobytes(),
+            html=render_to_string('paper_questions.html', {'questions': questions}),
+        ))
+    PaperPoolEntry.objects.bulk_create(entries, batch_size=500)
+    return len(entries)
+
+
+def fill_pool(n: int, target: int = None) -> int:
+    """Top the pool for ``n`` up to ``target`` papers; returns how many were added."""
+    target = pool_target() if target is None else target
+    return build_papers(n, target - PaperPoolEntry.objects.filter(n=n, claimed_by='').count())
+
+
+def _refill(n: int):
+    try:
+        fill_pool(n)
+    finally:
+        with _refill_lock:
+            _refilling.discard(n)
+        connection.close()
+
+
+def refill_in_background(n: int):
+    """Start a refill thread for ``n`` unless this process already runs one."""
+    with _refill_lock:
+        if n in _refilling:
+            return
+        _refilling.add(n)
+    threading.Thread(target=_refill, args=(n,), name=f'paper-pool-{n}', daemon=True).start()
+
+
+def _refill_pending():
+    global _refill_timer
+    with _refill_lock:
+        lengths = sorted(_pending_refills)
+        _pending_refills.clear()
+        _refill_timer = None
+    for n in lengths:
+        refill_in_background(n)
+
+
+def refill_after_pause(lengths):
+    """Refill ``lengths`` once no further call has come in for REFILL_DELAY_SECONDS."""
+    global _refill_timer
+    with _refill_lock:
+        _pending_refills.update(lengths)
+        if _refill_timer is not None:
+            _refill_timer.cancel()
+        _refill_timer = threading.Timer(REFILL_DELAY_SECONDS, _refill_pending)
+        _refill_timer.daemon = True
+        _refill_timer.start()
+
+
+def _claim_batch(n: int) -> list:
+    token = uuid.uuid4().hex
+    unclaimed = PaperPoolEntry.objects.filter(n=n, claimed_by='')
+    batch = unclaimed.order_by('id').values('id')[:CLAIM_BATCH]
+    with transaction.atomic():
+        # Re-checking claimed_by on the outer UPDATE keeps two workers from
+        # taking the same row; whoever loses the race tries the next batch.
+        # The exists() check keeps an empty pool from costing a write on
+        # every request.
+        while True:
+            if not unclaimed.exists():
+                return []
+            if PaperPoolEntry.objects.filter(claimed_by='', pk__in=Subquery(batch)).update(claimed_by=token):
+                break
+        claimed = PaperPoolEntry.objects.filter(claimed_by=token)
+        papers = [PooledPaper(array('q', bytes(qids)).tolist(), html)
+                  for qids, html in claimed.values_list('qids', 'html')]
+        claimed.delete()
+    low_water = pool_low_water()
+    if low_water and not unclaimed[low_water - 1:].exists():
+        refill_in_background(n)
+    return papers
+
+
+def take_paper(n: int):
+    """Hand out an unused pooled paper of ``n`` questions, or None if there is none."""
+    held = _held.get()
+    with _lock:
+        papers = held.get(n)
+        if papers:
+            return papers.pop()
+    papers = _claim_batch(n)
+    if not papers:
+        return None
+    paper = papers.pop()
+    with _lock:
+        held.setdefault(n, []).extend(papers)
+    return paper
+
+
+def discard_pool():
+    """Drop every pooled paper everywhere and rebuild the lengths that were pooled."""
+    lengths = set(PaperPoolEntry.objects.values_list('n', flat=True).distinct())
+    PaperPoolEntry.objects.all().delete()
+    bump_version(POOL_VERSION)
+    held = _held.get()
+    with _lock:
+        lengths.update(n for n, papers in held.items() if papers)
+    _held.invalidate()
+    if lengths:
+        refill_after_pause(lengths)
+
+
+def discard_pool_on_commit():
+    """Run ``discard_pool`` once the current transaction commits, at most once per transaction."""
+    pending = transaction.get_connection().run_on_commit
+    if not any(func is discard_pool for _, func, *_ in pending):
+        transaction.on_commit(discard_pool)
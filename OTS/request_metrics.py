@@ -0,0 +1,97 @@
+"""
+Per-request query count, DB time and template render time.
+
+``start()`` puts a RequestMetrics in a context variable for the current
+request, and ``stop()`` removes it. While one is set:
+
+- an execute wrapper added to every database connection counts statements
+  and their time;
+- templates from the TimedDjangoTemplates backend (set as the BACKEND in
+  TEMPLATES) count their render time.
+
+Context variables follow a request into ``sync_to_async`` threads, so
+queries made on behalf of async views are counted as well.
+``RequestTimingMiddleware`` (OTS.middleware) reports the numbers.
+"""
+import contextvars
+import time
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates, Template
+
+_current = contextvars.ContextVar('ots_request_metrics', default=None)
+_installed = False
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+    @property
+    def total_seconds(self):
+        return time.perf_counter() - self.started
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_seconds += time.perf_counter() - start
+
+
+def _watch_connection(connection, **kwargs):
+    # First in the list: connection.execute_wrapper() pops the last entry
+    # when it exits, which may be active while the connection opens.
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_seconds += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with render time counted per request."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+def install():
+    """Hook the database connections (once per process)."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    connection_created.connect(_watch_connection)
+    for connection in connections.all(initialized_only=True):
+        _watch_connection(connection)
+
+
+def start():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def stop(token):
+    _current.reset(token)
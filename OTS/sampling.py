@@ -0,0 +1,59 @@
+"""
+Random paper sampling backed by a compact, process-local array of question ids.
+
+The id array is loaded once (8 bytes per question) and dropped whenever a
+Question is saved or deleted, so a paper costs one ``in_bulk`` query for the
+n sampled rows instead of materializing the whole bank.
+"""
+import random
+import threading
+import time
+from array import array
+
+from OTS.models import Question
+
+# Other worker processes never see our signals, so reload at least this often.
+QID_CACHE_TTL_SECONDS = 60
+
+_lock = threading.Lock()
+_qids = None
+_loaded_at = 0.0
+
+
+def _load_qids() -> array:
+    qs = Question.objects.order_by('qid').values_list('qid', flat=True)
+    return array('q', qs.iterator(chunk_size=10000))
+
+
+def question_ids() -> array:
+    """Return the cached array of all question ids, loading it if needed."""
+    global _qids, _loaded_at
+    qids = _qids
+    if qids is not None and time.monotonic() - _loaded_at < QID_CACHE_TTL_SECONDS:
+        return qids
+    with _lock:
+        if _qids is None or time.monotonic() - _loaded_at >= QID_CACHE_TTL_SECONDS:
+            _qids = _load_qids()
+            _loaded_at = time.monotonic()
+        return _qids
+
+
+def invalidate_question_ids():
+    global _qids
+    with _lock:
+        _qids = None
+
+
+def sample_questions(n: int) -> list:
+    """Pick up to n distinct random questions with a single query."""
+    qids = question_ids()
+    k = max(0, min(n, len(qids)))
+    if not k:
+        return []
+    return questions_by_ids(random.sample(qids, k))
+
+
+def questions_by_ids(qids) -> list:
+    """Load the given questions in order; ids deleted meanwhile are skipped."""
+    by_id = Question.objects.in_bulk(qids)
+    return [by_id[qid] for qid in qids if qid in by_id]
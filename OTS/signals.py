@@ -0,0 +1,59 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from OTS.config import CONFIG_VERSION, invalidate_test_config
+from OTS.models import Question, QuestionSnapshot, TestConfig
+from OTS.paper_pool import discard_pool_on_commit
+from OTS.sampling import invalidate_question_ids
+from OTS.versions import bump_version
+from ots_common.questions import content_hash
+
+QUESTION_CONTENT_FIELDS = ('que', 'a', 'b', 'c', 'd', 'ans')
+
+
+def _snapshot(qid, version, content):
+    QuestionSnapshot.objects.get_or_create(qid=qid, version=version, defaults=content)
+
+
+@receiver(pre_save, sender=Question)
+def version_edited_question(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    old = Question.objects.filter(pk=instance.pk).values('version', *QUESTION_CONTENT_FIELDS).first()
+    instance._content_changed = bool(old and any(old[f] != getattr(instance, f) for f in QUESTION_CONTENT_FIELDS))
+    if instance._content_changed:
+        version = old.pop('version')
+        _snapshot(instance.pk, version, old)
+        instance.version = version + 1
+
+
+@receiver(pre_save, sender=Question)
+def hash_question_content(sender, instance, raw=False, **kwargs):
+    instance.content_hash = content_hash(*(getattr(instance, f) for f in QUESTION_CONTENT_FIELDS))
+
+
+@receiver(pre_delete, sender=Question)
+def snapshot_deleted_question(sender, instance, **kwargs):
+    _snapshot(instance.pk, instance.version, {f: getattr(instance, f) for f in QUESTION_CONTENT_FIELDS})
+
+
+@receiver(post_save, sender=Question)
+def question_saved(sender, instance, created=False, **kwargs):
+    invalidate_question_ids()
+    # Pooled papers stay valid when questions are added or edited without
+    # changing their content; they only miss the new ones until the next refill.
+    if getattr(instance, '_content_changed', False):
+        discard_pool_on_commit()
+
+
+@receiver(post_delete, sender=Question)
+def question_deleted(sender, **kwargs):
+    invalidate_question_ids()
+    discard_pool_on_commit()
+
+
+@receiver(post_save, sender=TestConfig)
+@receiver(post_delete, sender=TestConfig)
+def test_config_changed(sender, **kwargs):
+    bump_version(CONFIG_VERSION)
+    invalidate_test_config()
@@ -0,0 +1,120 @@
+"""
+Per-candidate aggregates kept in CandidateStats.
+
+Submissions fold into the row with a single UPDATE built from database-side
+expressions, so concurrent submissions never lose increments. The only value
+computed in Python is the short recent-points window, read under a row lock
+inside the same transaction, so every update stays O(1) in the number of
+attempts.
+"""
+from datetime import datetime
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from OTS.leaderboard import rebuild_leaderboard, record_score_change
+from OTS.models import Candidate, CandidateStats, Result
+from ots_common.rollups import ScoreRollup, recent_window, running_max, running_min
+
+
+def get_candidate_stats(username: str) -> CandidateStats:
+    """Return the stats row, or an empty unsaved one for a new candidate."""
+    return CandidateStats.objects.filter(candidate_id=username).first() or CandidateStats(candidate_id=username)
+
+
+def record_attempt(username: str, points: float):
+    """
+    Fold one graded attempt (its Result already stored) into the candidate's
+    stats row. Runs inside ``record_result``'s transaction, so it takes no
+    savepoint of its own.
+    """
+    with transaction.atomic(savepoint=False):
+        stats = CandidateStats.objects.select_for_update().filter(candidate_id=username).first()
+        if stats is None:
+            if _create_stats(username):
+                return
+            # A concurrent first submission created the row; fold into it.
+            stats = CandidateStats.objects.select_for_update().get(candidate_id=username)
+        CandidateStats.objects.filter(candidate_id=username).update(
+            attempts=F('attempts') + 1,
+            points_sum=F('points_sum') + points,
+            average_points=(F('points_sum') + points) / (F('attempts') + 1),
+            best_points=running_max('best_points', points),
+            worst_points=running_min('worst_points', points),
+            streak=Case(When(last_points__lt=points, then=F('streak') + 1), default=Value(0)),
+            last_points=Value(points),
+            recent_points=recent_window(stats.recent_points, points),
+            last_attempt=timezone.now(),
+        )
+        old_average = stats.points_sum / stats.attempts if stats.attempts else None
+        record_score_change(old_average, (stats.points_sum + points) / (stats.attempts + 1))
+
+
+def _create_stats(username: str) -> bool:
+    """Create the missing row from every stored result; False if another transaction got there first."""
+    rows = Result.objects.filter(username_id=username).order_by('resultid')
+    scores, last_attempt = rollup_results(rows.values_list('username_id', 'points', 'date', 'time'))[username]
+    try:
+        with transaction.atomic():
+            CandidateStats.objects.create(candidate_id=username, **_stats_fields(scores, last_attempt))
+    except IntegrityError:
+        return False
+    record_score_change(None, scores.average)
+    return True
+
+
+def _combine(date, time):
+    moment = datetime.combine(date, time)
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+def rollup_results(rows) -> dict:
+    """
+    Fold (candidate id, points, date, time) rows, ordered by candidate and
+    then by attempt, into {candidate id: (ScoreRollup, (date, time) of the
+    last attempt)}.
+    """
+    rollups = {}
+    for candidate_id, points, date, time in rows:
+        scores = rollups[candidate_id][0] if candidate_id in rollups else ScoreRollup()
+        scores.add(points)
+        rollups[candidate_id] = (scores, (date, time))
+    return rollups
+
+
+def _stats_fields(scores: ScoreRollup, last_attempt) -> dict:
+    return {
+        'attempts': scores.count, 'points_sum': scores.total, 'best_points': scores.best,
+        'worst_points': scores.worst, 'last_points': scores.last, 'streak': scores.streak,
+        'recent_points': list(scores.recent), 'last_attempt': _combine(*last_attempt) if last_attempt else None,
+        'average_points': scores.average,
+    }
+
+
+def store_rollups(candidate_ids, rollups) -> int:
+    """Write the rollups to CandidateStats and the Candidate summary columns."""
+    stored = 0
+    for candidate_id in candidate_ids:
+        scores, last_attempt = rollups.get(candidate_id) or (ScoreRollup(), None)
+        CandidateStats.objects.update_or_create(candidate_id=candidate_id,
+                                                defaults=_stats_fields(scores, last_attempt))
+        Candidate.objects.filter(username=candidate_id).update(test_attempted=scores.count, points=scores.average)
+        stored += 1
+    return stored
+
+
+def rebuild_candidate_stats(username=None) -> int:
+    """Recompute stats, the Candidate summary columns and the leaderboard from Result rows."""
+    candidates = Candidate.objects.all()
+    results = Result.objects.order_by('username_id', 'resultid')
+    if username:
+        candidates = candidates.filter(username=username)
+        results = results.filter(username_id=username)
+
+    rows = results.values_list('username_id', 'points', 'date', 'time')
+    rollups = rollup_results(rows.iterator(chunk_size=2000))
+    with transaction.atomic():
+        rebuilt = store_rollups(candidates.values_list('username', flat=True).iterator(), rollups)
+        rebuild_leaderboard()
+    return rebuilt
@@ -0,0 +1,226 @@
+import json
+from collections import Counter
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from OTS.grading import GradedPaper, grade, record_result
+from OTS import leaderboard, paper_pool
+from OTS.autosave import save_answers, saved_answers
+from OTS.exam_timer import active_timer, finish_timer, start_timer
+from OTS.models import Candidate, CandidateStats, ExamTimer, LeaderboardBucket, PaperPoolEntry, Question, Result
+from OTS.question_import import OTSQuestionTarget, import_rows
+from OTS.views import CHAT_INTENTS
+from ots_common.intents import IntentEngine
+
+# The configured default cache is shared and outlives the test database.
+LOCAL_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'},
+    'template_fragments': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-fragments'},
+}
+
+
+def _events(body: str) -> list:
+    """(event, payload) pairs of a server-sent event stream."""
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines())
+        events.append((lines.get('event', ''), json.loads(lines['data'])))
+    return events
+
+
+class ChatStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Candidate.objects.create(username='alice', password='pw', name='Alice')
+        cls.questions = [
+            Question.objects.create(que=f'Question {i}?', a='one', b='two', c='three', d='four', ans='A')
+            for i in range(3)
+        ]
+        qids = [q.qid for q in cls.questions]
+        record_result('alice', grade(qids, {qids[0]: 'A', qids[1]: 'B'}))
+
+    async def _stream(self, message: str) -> list:
+        await self.async_client.post('/login', {'username': 'alice', 'password': 'pw'})
+        response = await self.async_client.post('/api/chat/stream', json.dumps({'message': message}),
+                                                content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        return _events(body)
+
+    async def test_reply_reads_result_details(self):
+        events = await self._stream('show my mistakes')
+        self.assertEqual(events[-1], ('done', {}))
+        reply = ''.join(payload['token'] for event, payload in events if not event)
+        self.assertIn('Q2 — Correct: A) one', reply)
+        self.assertIn('Q3 — Correct: A) one', reply)
+
+    async def test_explain_question(self):
+        events = await self._stream('explain question 2')
+        reply = ''.join(payload['token'] for event, payload in events if not event)
+        self.assertIn('Question 1?', reply)
+
+    async def test_no_results_yet(self):
+        await Candidate.objects.acreate(username='bob', password='pw', name='Bob')
+        await self.async_client.post('/login', {'username': 'bob', 'password': 'pw'})
+        response = await self.async_client.post('/api/chat/stream', json.dumps({'message': 'hi'}),
+                                                content_type='application/json')
+        self.assertIn("haven't taken any tests", json.loads(response.content)['reply'])
+
+
+class QuestionImportTests(TestCase):
+    def _row(self, question, **extra):
+        return {'question': question, 'a': 'one', 'b': 'two', 'c': 'three', 'd': 'four', 'answer': 'b', **extra}
+
+    def test_insert_keeps_pooled_papers(self):
+        PaperPoolEntry.objects.create(n=1, qids=b'', html='')
+        progress = import_rows(enumerate([self._row('New?')], start=1), OTSQuestionTarget())
+        self.assertEqual(progress.inserted, 1)
+        self.assertEqual(PaperPoolEntry.objects.count(), 1)
+
+    def test_ots_target_ignores_difficulty(self):
+        rows = [self._row('Expert?', difficulty='expert'), self._row('Blank?', difficulty='')]
+        progress = import_rows(enumerate(rows, start=1), OTSQuestionTarget())
+        self.assertEqual((progress.inserted, progress.invalid), (2, 0))
+        self.assertEqual(Question.objects.get(que='Expert?').ans, 'B')
+
+    def test_duplicates_are_skipped(self):
+        rows = [self._row('Twice?'), self._row('  twice? ')]
+        progress = import_rows(enumerate(rows, start=1), OTSQuestionTarget())
+        self.assertEqual((progress.inserted, progress.duplicates), (1, 1))
+
+
+@override_settings(OTS_PAPER_POOL_LOW_WATER=0)
+class PaperPoolTests(TestCase):
+    def setUp(self):
+        paper_pool._held.invalidate()
+        self.questions = [Question.objects.create(que=f'Pooled {i}?', a='1', b='2', c='3', d='4', ans='C')
+                          for i in range(4)]
+        PaperPoolEntry.objects.bulk_create([
+            PaperPoolEntry(n=2, qids=array('q', [q.qid for q in pair]).tobytes(), html='')
+            for pair in (self.questions[:2], self.questions[2:])
+        ])
+
+    def test_take_paper_claims_and_deletes(self):
+        paper = paper_pool.take_paper(2)
+        self.assertEqual(len(paper.qids), 2)
+        self.assertFalse(PaperPoolEntry.objects.exists())
+        self.assertIsNotNone(paper_pool.take_paper(2))
+        self.assertIsNone(paper_pool.take_paper(2))
+
+    def test_failed_claim_leaves_papers_in_pool(self):
+        with mock.patch.object(paper_pool, 'PooledPaper', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                paper_pool.take_paper(2)
+        self.assertEqual(PaperPoolEntry.objects.filter(claimed_by='').count(), 2)
+
+    def test_bulk_delete_discards_once(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                for question in self.questions:
+                    question.delete()
+        self.assertEqual(callbacks, [paper_pool.discard_pool])
+
+
+class IntentTests(SimpleTestCase):
+    def assertIntent(self, message, intent, args=()):
+        match = CHAT_INTENTS.match(message)
+        self.assertEqual((match.intent, match.args), (intent, list(args)), message)
+
+    def test_explain_question_forms(self):
+        self.assertIntent('explain question 3', 'explain_question', [3])
+        self.assertIntent('Explain questions 3 and 4', 'explain_question', [3, 4])
+        self.assertIntent('explain q5', 'explain_question', [5])
+        self.assertIntent('explain Q 2', 'explain_question', [2])
+
+    def test_first_listed_intent_wins(self):
+        self.assertIntent('hi, explain question 2 to improve my progress', 'explain_question', [2])
+        self.assertIntent('hey, what is my score', 'greeting')
+        self.assertIsNone(CHAT_INTENTS.match('explain quantum physics'))
+
+    def test_lookarounds_see_the_whole_message(self):
+        engine = IntentEngine([
+            {'intent': 'greet_there', 'patterns': ['hi(?= there)']},
+            {'intent': 'mine', 'patterns': ['(?<=my )score']},
+            {'intent': 'score', 'keywords': ['score*']},
+        ])
+        self.assertEqual(engine.match('score, then hi there').intent, 'greet_there')
+        self.assertEqual(engine.match('what is my score').intent, 'mine')
+        self.assertEqual(engine.match('scores please').intent, 'score')
+
+
+@override_settings(CACHES=LOCAL_CACHES, OTS_AUTOSAVE_FLUSH_CHANGES=10, OTS_AUTOSAVE_FLUSH_SECONDS=15)
+class AutosaveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Candidate.objects.create(username='carol', password='pw', name='Carol')
+
+    def _start(self, duration_sec=600, n=3):
+        return start_timer('carol', n, duration_sec, int(time.time()), [1, 2, 3][:n])
+
+    def _stored(self, timer):
+        return ExamTimer.objects.get(pk=timer['attempt'])
+
+    def test_changes_batch_in_cache(self):
+        timer = self._start()
+        self.assertFalse(save_answers(timer, {1: 'A', 2: 'B'}))
+        self.assertEqual(self._stored(timer).saved_answers, {})
+        self.assertEqual(saved_answers(timer), {1: 'A', 2: 'B'})
+
+    def test_finish_stores_unflushed_answers(self):
+        timer = self._start()
+        save_answers(timer, {1: 'A', 2: 'B'})
+        save_answers(timer, {2: ''})
+        finish_timer('carol')
+        stored = self._stored(timer)
+        self.assertTrue(stored.finished)
+        self.assertEqual(stored.saved_answers, {'1': 'A'})
+        self.assertIsNone(active_timer('carol'))
+
+    def test_abandoned_attempt_keeps_its_answers(self):
+        first = self._start()
+        save_answers(first, {3: 'C'})
+        second = self._start(n=2)
+        self.assertEqual(self._stored(first).saved_answers, {'3': 'C'})
+        self.assertEqual(self._stored(second).saved_answers, {})
+        self.assertEqual(active_timer('carol')['attempt'], second['attempt'])
+
+    def test_last_seconds_write_through(self):
+        timer = self._start(duration_sec=10)
+        self.assertTrue(save_answers(timer, {1: 'D'}))
+        self.assertEqual(self._stored(timer).saved_answers, {'1': 'D'})
+
+
+class ConcurrentSubmissionTests(TransactionTestCase):
+    def test_parallel_submissions_are_all_counted(self):
+        usernames = [f'load{i}' for i in range(4)]
+        Candidate.objects.bulk_create([Candidate(username=u, password='pw', name=u) for u in usernames])
+        plan = [(usernames[i % 4], float(i % 7 - 3)) for i in range(40)]
+
+        def submit(item):
+            username, points = item
+            try:
+                record_result(username, GradedPaper(10, 0, 0, points, []))
+            finally:
+                close_old_connections()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(submit, plan))
+
+        self.assertEqual(Result.objects.count(), len(plan))
+        for username in usernames:
+            expected = [points for u, points in plan if u == username]
+            stats = CandidateStats.objects.get(candidate_id=username)
+            self.assertEqual(stats.attempts, len(expected))
+            self.assertEqual(stats.points_sum, sum(expected))
+            self.assertEqual(Candidate.objects.get(username=username).test_attempted, len(expected))
+        buckets = dict(LeaderboardBucket.objects.filter(candidates__gt=0).values_list('score', 'candidates'))
+        averages = CandidateStats.objects.values_list('average_points', flat=True)
+        self.assertEqual(sum(buckets.values()), len(usernames))
+        self.assertEqual(buckets, dict(Counter(leaderboard.bucket(a) for a in averages)))
@@ -10,7 +10,9 @@ urlpatterns = [
     path('home', candidateHome, name='home'),
     path('test-paper', testPaper, name='testPaper'),
     path('calculate-result', calculateTestResult, name='calculateTest'),
+    path('api/autosave', api_autosave, name='apiAutosave'),
     path('test-history', testResultHistory, name='testHistory'),
+    path('api/test-history', api_test_history, name='apiTestHistory'),
     path('result', showTestResult, name='result'),
     path('logout', logoutView, name='logout'),
 
@@ -18,4 +20,10 @@ urlpatterns = [
     path('test-detail', testDetail, name='testDetail'),
     path('chatbot', chatbot_page, name='chatbot'),
     path('api/chat', api_chatbot, name='apiChat'),
+    path('api/chat/stream', api_chatbot_stream, name='apiChatStream'),
+    path('api/chat/cache-stats', chat_cache_stats, name='chatCacheStats'),
+
+    # Staff exports
+    path('api/export/results', api_export_results, name='apiExportResults'),
+    path('metrics', prometheus_metrics, name='metrics'),
 ]
@@ -1,18 +1,34 @@
+from django.conf import settings
 from django.shortcuts import render
 from django.template import loader
-from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.views import redirect_to_login
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from django.utils.safestring import mark_safe
+from asgiref.sync import sync_to_async
 from OTS.models import *
-import random
+from OTS.chat_cache import chat_cache, chat_cache_key
+from OTS.chat_providers import get_chat_provider
+from OTS.autosave import OPTIONS as ANSWER_OPTIONS, save_answers, saved_answers
+from OTS.config import get_test_config
+from OTS.exam_timer import MAX_PAPER_QUESTIONS, active_timer, finish_timer, start_timer
+from OTS.grading import grade, record_result
+from OTS.history import HISTORY_PAGE_SIZE, history_page, history_row
+from OTS import leaderboard
+from OTS import metrics
+from OTS.paper_pool import take_paper
+from OTS.result_export import FORMATS as EXPORT_FORMATS, SOURCES as EXPORT_SOURCES, aiterate, export_chunks, gzipped
+from OTS.sampling import question_ids, questions_by_ids, sample_questions
+from OTS.stats import get_candidate_stats
+from ots_common.intents import IntentEngine
+from ots_common.metrics import GRADING_SECONDS, REGISTRY, SUBMISSIONS, TESTS_STARTED
 import time
 import json
-import os
-
-# OpenAI SDK (optional; used if OPENAI_API_KEY is configured)
-try:
-    from openai import OpenAI
-except Exception:
-    OpenAI = None
+from pathlib import Path
 
 
 def welcome(request):
@@ -59,11 +75,18 @@ def candidateHome(request):
         return HttpResponseRedirect("login")
     candidate = Candidate.objects.get(username=request.session['username'])
     total_questions = Question.objects.count()
-    return render(request, 'home.html', {'candidate': candidate, 'total_questions': total_questions})
+    stats = get_candidate_stats(candidate.username)
+    return render(request, 'home.html', {
+        'candidate': candidate,
+        'total_questions': total_questions,
+        'stats': stats,
+        'standing': leaderboard.standing(stats.average_points) if stats.attempts else None,
+        'leaders': leaderboard.top(5),
+    })
 
 
 def _compute_duration_minutes(n: int) -> int:
-    config = TestConfig.objects.first()
+    config = get_test_config()
     if config:
         if n <= 5:
             return config.minutes_short
@@ -82,41 +105,50 @@ def testPaper(request):
         n = int(request.GET.get('n', '5'))
     except ValueError:
         n = 5
-
-    question_pool = list(Question.objects.all())
-    random.shuffle(question_pool)
-    questions_list = question_pool[:n]
+    # At least one question, and no more than the bank holds.
+    n = max(1, min(n, len(question_ids()), MAX_PAPER_QUESTIONS))
 
     duration_minutes = _compute_duration_minutes(n)
     duration_seconds = duration_minutes * 60
 
-    # Persist timer in session
-    session_key = 'current_test_timer'
+    # The timer is kept server-side (OTS.exam_timer), not in the session.
+    username = request.session['username']
     now_sec = int(time.time())
-    timer = request.session.get(session_key)
+    timer = active_timer(username)
+    pooled = None
 
     if (
         not timer
-        or timer.get('n') != n
-        or (now_sec - int(timer.get('start_ts', now_sec))) >= int(timer.get('duration_sec', duration_seconds))
+        or timer['n'] != n
+        or (now_sec - timer['start_ts']) >= timer['duration_sec']
     ):
-        timer = {'n': n, 'start_ts': now_sec, 'duration_sec': duration_seconds}
-        request.session[session_key] = timer
-        request.session.modified = True
+        pooled = take_paper(n)
+        questions_list = [] if pooled else sample_questions(n)
+        qids = pooled.qids if pooled else [q.qid for q in questions_list]
+        timer = start_timer(username, n, duration_seconds, now_sec, qids)
+        saved = {}
+        TESTS_STARTED.inc(app='OTS', source='pool' if pooled else 'sampled')
+    else:
+        # Reloading a running test shows the same paper with its autosaved answers.
+        questions_list = questions_by_ids(timer['qids'])
+        saved = saved_answers(timer)
 
     elapsed = max(0, now_sec - int(timer['start_ts']))
     remaining_seconds = max(0, int(timer['duration_sec']) - elapsed)
 
-    config = TestConfig.objects.first()
+    config = get_test_config()
     show_leave_warning = bool(config.show_leave_warning) if config else True
 
     context = {
         'questions': questions_list,
+        'paper_html': mark_safe(pooled.html) if pooled else '',
         'total_questions': n,
         'time_limit_minutes': duration_minutes,
         'time_limit_seconds': remaining_seconds,
         'total_duration_seconds': int(timer['duration_sec']),
         'show_leave_warning': show_leave_warning,
+        'attempt': timer['attempt'],
+        'saved_answers': saved,
     }
     return render(request, 'test_paper.html', context)
 
@@ -125,71 +157,68 @@ def calculateTestResult(request):
     if 'name' not in request.session:
         return HttpResponseRedirect("login")
 
-    total_attempt = 0
-    total_right = 0
-    total_wrong = 0
-    qid_list = []
-    details = []
-
-    for k in request.POST:
-        if k.startswith('qno'):
-            qid_list.append(int(request.POST[k]))
-
-    for qid in qid_list:
-        question = Question.objects.get(qid=qid)
-        user_answer = request.POST.get('q' + str(qid), '').upper()
-        correct_answer = (question.ans or '').upper()
-        is_correct = (user_answer == correct_answer) and (user_answer != '')
-
-        if user_answer:
-            total_attempt += 1
-            if is_correct:
-                total_right += 1
-            else:
-                total_wrong += 1
-
-        details.append({
-            'qid': qid,
-            'question': question.que,
-            'options': {'A': question.a, 'B': question.b, 'C': question.c, 'D': question.d},
-            'correct': correct_answer,
-            'user': user_answer or '-',
-            'is_correct': is_correct
-        })
-
-    total_questions = max(len(qid_list), 1)
-    points = (total_right - total_wrong) / total_questions * 10
-
-    result = Result(
-        username=Candidate.objects.get(username=request.session['username']),
-        attempt=total_attempt,
-        right=total_right,
-        wrong=total_wrong,
-        points=points,
-        details=details
-    )
-    result.save()
+    paper = [int(request.POST[k]) for k in request.POST if k.startswith('qno')]
+    answers = {qid: request.POST.get('q' + str(qid), '') for qid in paper}
+    with GRADING_SECONDS.time(app='OTS'):
+        record_result(request.session['username'], grade(paper, answers))
+    SUBMISSIONS.inc(app='OTS')
+    finish_timer(request.session['username'])
 
-    candidate = Candidate.objects.get(username=request.session['username'])
-    candidate.test_attempted += 1
-    candidate.points = (candidate.points * (candidate.test_attempted - 1) + points) / candidate.test_attempted
-    candidate.save()
+    return HttpResponseRedirect('result')
 
-    if 'current_test_timer' in request.session:
-        try:
-            del request.session['current_test_timer']
-        except KeyError:
-            pass
 
-    return HttpResponseRedirect('result')
+def api_autosave(request):
+    """
+    Autosave answers on the running paper.
+    POST {"attempt": id, "answers": {qid: "A".."D" or "" to clear}}.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST allowed'}, status=405)
+    username = request.session.get('username')
+    if not username:
+        return JsonResponse({'error': 'Please log in.'}, status=401)
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        attempt = int(data.get('attempt'))
+        changes = {int(qid): (option or '').upper() for qid, option in data.get('answers', {}).items()}
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({'error': 'Invalid autosave request'}, status=400)
+
+    timer = active_timer(username)
+    if not timer or timer['attempt'] != attempt or int(time.time()) - timer['start_ts'] >= timer['duration_sec']:
+        return JsonResponse({'error': 'This test is no longer running.'}, status=409)
+    paper = set(timer['qids'])
+    if any(qid not in paper or (option and option not in ANSWER_OPTIONS) for qid, option in changes.items()):
+        return JsonResponse({'error': 'Invalid autosave request'}, status=400)
+
+    flushed = save_answers(timer, changes)
+    return JsonResponse({'saved': len(changes), 'flushed': flushed})
 
 
 def testResultHistory(request):
     if 'name' not in request.session:
         return HttpResponseRedirect("login")
     candidate = Candidate.objects.get(username=request.session['username'])
-    results = Result.objects.filter(username_id=candidate.username)
-    return render(request, 'candidate_history.html', {'candidate': candidate, 'results': results})
+    results, next_cursor = history_page(candidate.username)
+    return render(request, 'candidate_history.html', {
+        'candidate': candidate,
+        'results': results,
+        'next_cursor': next_cursor,
+        'stats': get_candidate_stats(candidate.username),
+    })
+
+
+def api_test_history(request):
+    username = request.session.get('username')
+    if not username:
+        return JsonResponse({'error': 'Not logged in'}, status=401)
+    try:
+        before = int(request.GET['before']) if request.GET.get('before') else None
+        limit = int(request.GET.get('limit', HISTORY_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    results, next_cursor = history_page(username, before, limit)
+    return JsonResponse({'results': [history_row(r) for r in results], 'next': next_cursor})
 
 
 def testDetail(request):
@@ -221,11 +250,7 @@ def showTestResult(request):
 
 def logoutView(request):
     if 'name' in request.session:
-        if 'current_test_timer' in request.session:
-            try:
-                del request.session['current_test_timer']
-            except KeyError:
-                pass
+        finish_timer(request.session['username'])
         del request.session['username']
         del request.session['name']
     return HttpResponseRedirect("login")
@@ -237,24 +262,34 @@ def _summarize_mistakes(result: Result):
         return "Great job! There are no mistakes in your latest test."
     lines = []
     for idx, d in enumerate(wrongs, start=1):
-        correct_opt = d.get('correct')
-        correct_text = d.get('options', {}).get(correct_opt, '')
-        lines.append(f"{idx}. Q{d.get('qid')} — Correct: {correct_opt}) {correct_text}")
+        lines.append(f"{idx}. Q{d.get('qid')} — Correct: {d.get('correct')}) {d.get('correct_text')}")
     return "Here are your mistakes and the correct answers:\n" + "\n".join(lines)
 
 
-def _openai_client():
-    api_key = os.getenv('OPENAI_API_KEY', '')
-    if not api_key or OpenAI is None:
-        return None
-    return OpenAI(api_key=api_key)
+def _summarize_progress(stats):
+    if not stats.attempts:
+        return "You haven't completed any tests yet."
+    streak = (
+        f"You've improved {stats.streak} test{'s' if stats.streak != 1 else ''} in a row."
+        if stats.streak else "Beat your last score to start an improvement streak."
+    )
+    return (
+        f"Across {stats.attempts} test{'s' if stats.attempts != 1 else ''} your best score is {round(stats.best_points, 2)} / 10 "
+        f"and your lowest is {round(stats.worst_points, 2)}. "
+        f"Your last {len(stats.recent_points)} test{'s' if len(stats.recent_points) != 1 else ''} "
+        f"average {round(stats.recent_average, 2)}. {streak}"
+    )
 
 
-def _openai_chat_reply(user_message: str, result: Result) -> str:
-    client = _openai_client()
-    if client is None:
-        return ""
+CHAT_SYSTEM_PROMPT = (
+    "You are a helpful test review assistant. "
+    "Explain clearly, be concise, and encourage learning. "
+    "When explaining a question, identify it by qid and why the correct choice is correct. "
+    "If the student was wrong, gently point out the mistake and how to avoid it next time."
+)
 
+
+def _chat_messages(user_message: str, result: Result, stats: CandidateStats) -> list:
     summary = {
         "attempt": result.attempt,
         "right": result.right,
@@ -269,107 +304,279 @@ def _openai_chat_reply(user_message: str, result: Result) -> str:
                 "is_correct": d.get("is_correct"),
             }
             for d in (result.details or [])
-        ][:50]
+        ][:50],
+        "history": {
+            "tests_taken": stats.attempts,
+            "best_points": stats.best_points,
+            "worst_points": stats.worst_points,
+            "recent_average": round(stats.recent_average, 2),
+            "improvement_streak": stats.streak,
+        },
     }
+    return [
+        {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": (
+                "Here is my latest test summary (JSON):\n"
+                f"{json.dumps(summary, ensure_ascii=False)}\n\n"
+                f"My question: {user_message}"
+            )
+        }
+    ]
 
-    system = (
-        "You are a helpful test review assistant. "
-        "Explain clearly, be concise, and encourage learning. "
-        "When explaining a question, identify it by qid and why the correct choice is correct. "
-        "If the student was wrong, gently point out the mistake and how to avoid it next time."
-    )
+
+def _openai_chat_reply(user_message: str, result: Result, stats: CandidateStats, provider=None) -> str:
+    provider = provider or get_chat_provider()
+    if provider is None:
+        return ""
     try:
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=0.2,
-            max_tokens=600,
-            messages=[
-                {"role": "system", "content": system},
-                {
-                    "role": "user",
-                    "content": (
-                        "Here is my latest test summary (JSON):\n"
-                        f"{json.dumps(summary, ensure_ascii=False)}\n\n"
-                        f"My question: {user_message}"
-                    )
-                }
-            ],
-        )
-        reply = (completion.choices[0].message.content or "").strip()
-        return reply or ""
+        with metrics.CHAT_PROVIDER_SECONDS.time(endpoint='blocking', provider=provider.name):
+            return provider.complete(_chat_messages(user_message, result, stats)).strip()
     except Exception:
+        metrics.CHAT_PROVIDER_ERRORS.inc(endpoint='blocking', provider=provider.name)
         return ""
 
 
-@csrf_exempt
-def api_chatbot(request):
-    """
-    Chatbot API:
-    - If OPENAI_API_KEY is set, uses OpenAI to respond with test-aware help.
-    - Otherwise, falls back to a simple rule-based answer.
-    """
-    if request.method != 'POST':
-        return JsonResponse({'error': 'Only POST allowed'}, status=405)
+CHAT_INTENTS = IntentEngine.from_file(getattr(settings, 'OTS_CHAT_INTENTS_FILE', None)
+                                      or Path(__file__).with_name('chat_intents.json'))
+
+
+def _explain_question(result: Result, qid: int) -> str:
+    detail = next((d for d in (result.details or []) if d.get('qid') == qid), None)
+    if not detail:
+        return f"I couldn't find details for question {qid} in your latest test."
+    return (
+        f"Q{qid}: {detail.get('question')}\n"
+        f"Your answer: {detail.get('user')}) {detail.get('user_text') or ''}\n"
+        f"Correct answer: {detail.get('correct')}) {detail.get('correct_text')}\n"
+        f"{'You were correct!' if detail.get('is_correct') else 'This is the correct choice because it best matches the question.'}"
+    )
+
+
+def _rule_based_reply(message: str, result: Result, stats: CandidateStats) -> str:
+    match = CHAT_INTENTS.match(message)
+    intent = match.intent if match else None
+    if intent == 'greeting':
+        reply = "Hello! I can explain your score, list mistakes, or explain a specific question. Try: 'show my mistakes' or 'explain question 12'."
+    elif intent == 'progress':
+        reply = _summarize_progress(stats)
+    elif intent == 'score':
+        reply = f"You attempted {result.attempt} questions. Correct: {result.right}, Wrong: {result.wrong}. Points: {round(result.points, 2)} / 10."
+    elif intent == 'mistakes':
+        reply = _summarize_mistakes(result)
+    elif intent == 'explain_question':
+        if match.args:
+            reply = "\n\n".join(_explain_question(result, qid) for qid in dict.fromkeys(match.args))
+        else:
+            reply = "Please specify the question number, e.g., 'explain question 12'."
+    else:
+        reply = "I can help with: 'show my mistakes', 'explain question 7', or 'what is my score?'."
+    return reply
+
+
+def _cached_rule_reply(message: str, result: Result, stats: CandidateStats) -> str:
+    key = chat_cache_key(result, stats, None, message)
+    return chat_cache.get_or_set(key, lambda: _rule_based_reply(message, result, stats))
+
+
+def _chat_reply(message: str, result: Result, stats: CandidateStats) -> str:
+    provider = get_chat_provider()
+    if provider is not None:
+        key = chat_cache_key(result, stats, provider, message)
+        reply = chat_cache.get(key)
+        if reply is None:
+            reply = _openai_chat_reply(message, result, stats, provider)
+            if reply:
+                chat_cache.set(key, reply)
+        if reply:
+            return reply
+    return _cached_rule_reply(message, result, stats)
+
+
+def _parse_chat_request(request):
     try:
         data = json.loads(request.body.decode('utf-8'))
     except Exception:
         data = {}
+    return (data.get('message') or '').strip(), data.get('resultid')
 
-    message = (data.get('message') or '').strip()
-    rid = data.get('resultid')
-    username = request.session.get('username')
 
+def _load_chat_context(request, rid):
+    """
+    Resolve the logged-in candidate's result and stats for a chat message.
+
+    Returns (result, stats, None) or (None, None, (reply, status)) when the
+    chat can't go ahead.
+    """
+    username = request.session.get('username')
     if not username:
-        return JsonResponse({'reply': "Please log in to use the test assistant."}, status=401)
+        return None, None, ("Please log in to use the test assistant.", 401)
 
     result = None
     if rid:
         try:
             result = Result.objects.get(resultid=int(rid), username_id=username)
-        except Result.DoesNotExist:
+        except (Result.DoesNotExist, TypeError, ValueError):
             result = None
     if not result:
         result = Result.objects.filter(username_id=username).order_by('-resultid').first()
         if not result:
-            return JsonResponse({'reply': "You haven't taken any tests yet. Take a test first!"})
+            return None, None, ("You haven't taken any tests yet. Take a test first!", 200)
+    return result, get_candidate_stats(username), None
 
-    # Try OpenAI first
-    ai_reply = _openai_chat_reply(message, result)
-    if ai_reply:
-        return JsonResponse({'reply': ai_reply})
 
-    # Fallback rule-based
-    lower = message.lower()
-    if any(k in lower for k in ['hello', 'hi', 'hey']):
-        reply = "Hello! I can explain your score, list mistakes, or explain a specific question. Try: 'show my mistakes' or 'explain question 12'."
-    elif any(k in lower for k in ['score', 'points', 'how did i do', 'result']):
-        reply = f"You attempted {result.attempt} questions. Correct: {result.right}, Wrong: {result.wrong}. Points: {round(result.points, 2)} / 10."
-    elif any(k in lower for k in ['mistake', 'mistakes', 'wrong']):
-        reply = _summarize_mistakes(result)
-    elif 'explain question' in lower:
-        num = ''.join([c for c in lower if c.isdigit()])
-        if num:
-            qid = int(num)
-            detail = next((d for d in (result.details or []) if d.get('qid') == qid), None)
-            if detail:
-                correct_opt = detail.get('correct')
-                correct_text = detail.get('options', {}).get(correct_opt, '')
-                user_opt = detail.get('user')
-                user_text = detail.get('options', {}).get(user_opt, '')
-                reply = (
-                    f"Q{qid}: {detail.get('question')}\n"
-                    f"Your answer: {user_opt}) {user_text or ''}\n"
-                    f"Correct answer: {correct_opt}) {correct_text}\n"
-                    f"{'You were correct!' if detail.get('is_correct') else 'This is the correct choice because it best matches the question.'}"
-                )
-            else:
-                reply = f"I couldn't find details for question {qid} in your latest test."
-        else:
-            reply = "Please specify the question number, e.g., 'explain question 12'."
-    else:
-        reply = "I can help with: 'show my mistakes', 'explain question 7', or 'what is my score?'."
+@csrf_exempt
+def api_chatbot(request):
+    """
+    Chatbot API:
+    - If an LLM provider is configured, uses it to respond with test-aware help.
+    - Otherwise, falls back to a simple rule-based answer.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST allowed'}, status=405)
+    metrics.CHAT_REQUESTS.inc(endpoint='blocking')
+    message, rid = _parse_chat_request(request)
+    result, stats, early = _load_chat_context(request, rid)
+    if early:
+        reply, status = early
+        return JsonResponse({'reply': reply}, status=status)
+
+    return JsonResponse({'reply': _chat_reply(message, result, stats)})
+
+
+@staff_member_required
+def chat_cache_stats(request):
+    return JsonResponse(chat_cache.stats())
+
+
+@staff_member_required
+def prometheus_metrics(request):
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
-    return JsonResponse({'reply': reply})
+
+def _sse(payload: dict, event: str = '') -> str:
+    prefix = f"event: {event}\n" if event else ''
+    return f"{prefix}data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+async def _chat_event_stream(provider, messages, fallback: str, cache_key=None):
+    chunks = []
+    metrics.CHAT_STREAMS_OPEN.inc()
+    try:
+        if provider is not None:
+            start = time.perf_counter()
+            try:
+                async for chunk in provider.stream(messages):
+                    if not chunks:
+                        metrics.CHAT_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - start, provider=provider.name)
+                    chunks.append(chunk)
+                    yield _sse({'token': chunk})
+                metrics.CHAT_PROVIDER_SECONDS.observe(time.perf_counter() - start, endpoint='stream',
+                                                      provider=provider.name)
+                if chunks and cache_key is not None:
+                    chat_cache.set(cache_key, ''.join(chunks).strip())
+            except Exception:
+                metrics.CHAT_PROVIDER_ERRORS.inc(endpoint='stream', provider=provider.name)
+        if not chunks:
+            yield _sse({'token': fallback})
+        yield _sse({}, event='done')
+    finally:
+        metrics.CHAT_STREAMS_OPEN.dec()
+
+
+def _prepare_chat_stream(message: str, result: Result, stats: CandidateStats):
+    """
+    Everything the event stream needs, computed in a worker thread:
+    ``result.details`` queries the question bank on first access.
+    """
+    provider = get_chat_provider()
+    cache_key = chat_cache_key(result, stats, provider, message) if provider is not None else None
+    cached = chat_cache.get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        provider = None
+    fallback = cached or _cached_rule_reply(message, result, stats)
+    messages = _chat_messages(message, result, stats) if provider is not None else None
+    return provider, messages, fallback, cache_key
+
+
+async def api_chatbot_stream(request):
+    """
+    Streaming chatbot API (ASGI): same answers as ``api_chatbot`` delivered
+    as server-sent events, so a slow model holds no worker thread.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST allowed'}, status=405)
+    metrics.CHAT_REQUESTS.inc(endpoint='stream')
+    message, rid = _parse_chat_request(request)
+    result, stats, early = await sync_to_async(_load_chat_context)(request, rid)
+    if early:
+        reply, status = early
+        return JsonResponse({'reply': reply}, status=status)
+
+    provider, messages, fallback, cache_key = await sync_to_async(_prepare_chat_stream)(message, result, stats)
+    response = StreamingHttpResponse(
+        _chat_event_stream(provider, messages, fallback, cache_key), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# csrf_exempt() only learned to wrap async views in Django 5.0.
+api_chatbot_stream.csrf_exempt = True
+
+
+def _parse_export_request(request):
+    """
+    Check staff access and read the export options from the query string.
+
+    Returns (options, None), or (None, response) when the export can't go ahead.
+    """
+    if not (request.user.is_active and request.user.is_staff):
+        return None, redirect_to_login(request.get_full_path(), reverse('admin:login'))
+    params = request.GET
+    fmt = params.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return None, JsonResponse({'error': 'format must be csv or ndjson'}, status=400)
+    if params.get('model', 'OTS') not in EXPORT_SOURCES:
+        return None, JsonResponse({'error': 'Unknown model'}, status=400)
+    try:
+        source = EXPORT_SOURCES[params.get('model', 'OTS')]()
+    except LookupError as exc:
+        return None, JsonResponse({'error': str(exc)}, status=404)
+    filters = {'candidate': params.get('candidate') or None}
+    for key in ('since', 'until'):
+        try:
+            filters[key] = parse_date(params[key]) if params.get(key) else None
+        except ValueError:
+            filters[key] = None
+        if params.get(key) and filters[key] is None:
+            return None, JsonResponse({'error': 'Dates must be YYYY-MM-DD'}, status=400)
+    return {'source': source, 'fmt': fmt, 'filters': filters, 'gzip': params.get('gzip') in ('1', 'true')}, None
+
+
+async def api_export_results(request):
+    """
+    Staff-only streaming export of results as CSV or NDJSON.
+    Query: model=OTS|ots_app, format=csv|ndjson, since/until=YYYY-MM-DD,
+    candidate=<username>, gzip=1.
+    """
+    options, early = await sync_to_async(_parse_export_request)(request)
+    if early:
+        return early
+    source, fmt = options['source'], options['fmt']
+    chunks = export_chunks(source, fmt, **options['filters'])
+    filename = f"{source.model._meta.model_name}s.{fmt}"
+    if options['gzip']:
+        chunks, content_type, filename = gzipped(chunks), 'application/gzip', filename + '.gz'
+    else:
+        content_type = f"{EXPORT_FORMATS[fmt]}; charset=utf-8"
+    if isinstance(request, ASGIRequest):
+        chunks = aiterate(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 def chatbot_page(request):
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Subject, Question
+from .models import User, Subject, Question, StudentStats
 
 
 @admin.register(User)
@@ -22,3 +22,10 @@ class SubjectAdmin(admin.ModelAdmin):
 class QuestionAdmin(admin.ModelAdmin):
     list_display = ['question', 'subject', 'correct_answer']
     list_filter = ['subject']
+
+
+@admin.register(StudentStats)
+class StudentStatsAdmin(admin.ModelAdmin):
+    list_display = ['student', 'tests_taken', 'percentage_sum', 'best_percentage', 'last_test']
+    search_fields = ['student__username']
+    readonly_fields = ['tests_taken', 'percentage_sum', 'best_percentage', 'last_test']
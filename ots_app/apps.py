@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class OtsAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ots_app'
+
+    def ready(self):
+        from ots_app import signals  # noqa: F401
@@ -0,0 +1,46 @@
+"""
+Process-level cache of the subject catalog with question counts.
+
+``subject_catalog`` returns every subject with its question count, built by
+one annotated query. Saving or deleting a Subject or Question bumps the
+``ots_app_catalog`` version (see ots_app.signals). Each process re-checks
+that version at most every VERSION_CHECK_SECONDS (ots_common.versions), and
+reloads only when it has moved, so dashboard loads in between cost no
+queries. The version also serves as the catalog's ETag, so clients holding
+a current copy get a 304.
+"""
+from django.db.models import Count
+
+from ots_app.models import Subject
+from ots_app.versions import VersionedCache
+
+CATALOG_VERSION = 'ots_app_catalog'
+
+
+class Catalog:
+    def __init__(self, subjects, version):
+        self.subjects = subjects
+        self.version = version
+        self.etag = f'"subjects-{version}"'
+
+    @property
+    def total_questions(self):
+        return sum(subject['question_count'] for subject in self.subjects)
+
+
+def _load_catalog(version) -> Catalog:
+    subjects = (Subject.objects.annotate(question_count=Count('question')).order_by('id')
+                .values('id', 'name', 'description', 'question_count', 'created_at'))
+    return Catalog(list(subjects), version)
+
+
+_catalog = VersionedCache(CATALOG_VERSION, _load_catalog)
+
+
+def subject_catalog() -> Catalog:
+    """Return the cached catalog, reloading it when the version has moved."""
+    return _catalog.get()
+
+
+def invalidate_subject_catalog():
+    _catalog.invalidate()
@@ -0,0 +1,84 @@
+"""
+Delivery payload for ``get_test``: what a student needs to sit a test.
+
+A test's questions are fixed when it is created, so its payload is built
+once and kept in the default cache: the JSON body, a gzipped copy and
+their ETags, both for the whole test and for each section of
+OTS_TEST_SECTION_SIZE questions. Questions carry only their id, text and
+the four options in A-D order. Correct answers and explanations stay in
+``Test.questions`` on the server. The owning student's id is cached with
+the payload, so repeat requests cost no queries.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.text import compress_string
+
+from ots_app.models import Test
+
+# Payloads stay cached this long past the test's time limit.
+CACHE_GRACE_SECONDS = 3600
+
+
+def _cache_key(test_id) -> str:
+    return f'ots_app:test_delivery:{test_id}'
+
+
+def _encode(payload) -> dict:
+    body = json.dumps(payload, separators=(',', ':')).encode()
+    digest = hashlib.sha1(body).hexdigest()[:20]
+    return {'body': body, 'etag': f'"{digest}"', 'gzip': compress_string(body), 'gzip_etag': f'"{digest}-gz"'}
+
+
+def _build(test: Test) -> dict:
+    questions = [
+        {'id': q['id'], 'question': q['question'],
+         'options': [q['option_a'], q['option_b'], q['option_c'], q['option_d']]}
+        for q in test.questions
+    ]
+    header = {
+        'id': test.id, 'subject': test.subject_id, 'subject_name': test.subject.name,
+        'total_questions': test.total_questions, 'time_limit': test.time_limit,
+        'start_time': test.start_time.isoformat(),
+    }
+    size = max(1, getattr(settings, 'OTS_TEST_SECTION_SIZE', 10))
+    sections = [questions[i:i + size] for i in range(0, len(questions), size)] or [[]]
+    pages = {0: _encode({**header, 'sections': len(sections), 'questions': questions})}
+    for number, section in enumerate(sections, start=1):
+        pages[number] = _encode({**header, 'sections': len(sections), 'section': number, 'questions': section})
+    return {'student_id': test.student_id, 'pages': pages}
+
+
+def test_delivery(test_id):
+    """Return the cached {student_id, pages} for a test, or None when it doesn't exist."""
+    entry = cache.get(_cache_key(test_id))
+    if entry is None:
+        test = Test.objects.select_related('subject').filter(pk=test_id).first()
+        if test is None:
+            return None
+        entry = _build(test)
+        cache.set(_cache_key(test_id), entry, test.time_limit * 60 + CACHE_GRACE_SECONDS)
+    return entry
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip, honouring q-values (``gzip;q=0`` refuses it)."""
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+
+def discard_test_delivery(test_id):
+    cache.delete(_cache_key(test_id))
@@ -0,0 +1,58 @@
+import random
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from ots_app import sampling
+from ots_app.models import Question, Subject
+from ots_common.bench import measure, scratch_database
+
+DIFFICULTY_WEIGHTS = (3, 5, 2)  # easy/medium/hard share of the generated bank
+
+
+def fill_subject(subject, total, batch=20000):
+    rng = random.Random(subject.pk)
+    for start in range(0, total, batch):
+        Question.objects.bulk_create([
+            Question(subject=subject, question=f'Question {i}', option_a='1', option_b='2', option_c='3',
+                     option_d='4', correct_answer='A',
+                     difficulty=rng.choices(sampling.DIFFICULTIES, DIFFICULTY_WEIGHTS)[0])
+            for i in range(start, min(total, start + batch))])
+
+
+class Command(BaseCommand):
+    help = "Benchmark difficulty-stratified create_test sampling against order_by('?')"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--per-subject', type=int, default=100000, help='Questions per subject')
+        parser.add_argument('--subjects', type=int, default=3)
+        parser.add_argument('-n', type=int, default=30, help='Questions per paper')
+        parser.add_argument('--mix', default='40/40/20', help='easy/medium/hard percentages')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        n = options['n']
+        mix = sampling.parse_mix(options['mix'])
+        with scratch_database():
+            subjects = [Subject.objects.create(name=f'Bench {i}') for i in range(options['subjects'])]
+            for subject in subjects:
+                fill_subject(subject, options['per_subject'])
+            subject = subjects[0]
+
+            def order_by_random():
+                return list(Question.objects.filter(subject=subject).order_by('?')[:n])
+
+            sampling.invalidate_question_buckets()
+            first_t, first_mem = measure(lambda: (sampling.invalidate_question_buckets(),
+                                                  sampling.sample_paper(subject.pk, n, mix)), 3)
+            cached_t, cached_mem = measure(lambda: sampling.sample_paper(subject.pk, n, mix), options['repeat'])
+            random_t, random_mem = measure(order_by_random, max(1, options['repeat'] // 5))
+            drawn = Counter(q.difficulty for q in sampling.sample_paper(subject.pk, n, mix))
+
+        self.stdout.write(f"{options['per_subject']} questions per subject, {n}-question papers, mix {options['mix']}")
+        self.stdout.write(f"{'':<22}{'ms':>10}{'KiB':>10}")
+        self.stdout.write(f"{'bucket load + draw':<22}{first_t * 1000:>10.3f}{first_mem / 1024:>10.1f}")
+        self.stdout.write(f"{'cached draw':<22}{cached_t * 1000:>10.3f}{cached_mem / 1024:>10.1f}")
+        label = "order_by('?')"
+        self.stdout.write(f"{label:<22}{random_t * 1000:>10.3f}{random_mem / 1024:>10.1f}")
+        self.stdout.write('drawn: ' + ', '.join(f'{d} {drawn[d]}' for d in sampling.DIFFICULTIES))
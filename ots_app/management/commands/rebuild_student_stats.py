@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ots_app.stats import rebuild_student_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-student statistics from stored test results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--student-id', type=int, help='Only rebuild this student')
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_student_stats(options['student_id'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {rebuilt} student(s).'))
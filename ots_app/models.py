@@ -27,6 +27,12 @@ class Subject(models.Model):
 
 
 class Question(models.Model):
+    DIFFICULTY_CHOICES = [
+        ('easy', 'Easy'),
+        ('medium', 'Medium'),
+        ('hard', 'Hard'),
+    ]
+
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
     question = models.TextField()
     option_a = models.CharField(max_length=200)
@@ -35,6 +41,17 @@ class Question(models.Model):
     option_d = models.CharField(max_length=200)
     correct_answer = models.CharField(max_length=1, choices=[('A', 'A'), ('B', 'B'), ('C', 'C'), ('D', 'D')])
     explanation = models.TextField(blank=True)
+    difficulty = models.CharField(max_length=6, choices=DIFFICULTY_CHOICES, default='medium')
+    content_hash = models.CharField(max_length=40, blank=True, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=['subject', 'difficulty'], name='question_subject_difficulty')]
+
+    def save(self, *args, **kwargs):
+        from ots_common.questions import content_hash
+        self.content_hash = content_hash(self.question, self.option_a, self.option_b, self.option_c,
+                                         self.option_d, self.correct_answer)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.subject.name} - {self.question[:50]}..."
@@ -121,3 +138,36 @@ class TestResult(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+
+
+class StudentStats(models.Model):
+    # Rollup of a student's TestResults, folded in by submit_test (see
+    # ots_app.stats); rebuild with ``manage.py rebuild_student_stats``.
+    student = models.OneToOneField(User, primary_key=True, on_delete=models.CASCADE, related_name='stats')
+    tests_taken = models.PositiveIntegerField(default=0)
+    percentage_sum = models.FloatField(default=0.0)
+    best_percentage = models.FloatField(null=True, blank=True)
+    # {subject id: {"tests": n, "percentage_sum": x, "best": y}}
+    subjects = models.JSONField(default=dict, blank=True)
+    # {"YYYY-MM": [tests, percentage sum]}, one entry per month with results.
+    monthly = models.JSONField(default=dict, blank=True)
+    # Percentages of the most recent tests, oldest first (see ots_common.rollups.RECENT_WINDOW).
+    recent_percentages = models.JSONField(default=list, blank=True)
+    last_test = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def average_percentage(self):
+        return self.percentage_sum / self.tests_taken if self.tests_taken else 0.0
+
+    def __str__(self):
+        return f"Stats for {self.student_id} ({self.tests_taken} tests)"
+
+
+class CacheVersion(models.Model):
+    # Version counters for process-local caches (see ots_app.versions);
+    # bumping one makes every worker reload the matching cache on its next check.
+    name = models.CharField(primary_key=True, max_length=50)
+    version = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
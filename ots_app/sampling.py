@@ -0,0 +1,103 @@
+"""
+Difficulty-stratified paper sampling for ``create_test``.
+
+Question ids are cached per subject as one compact array per difficulty.
+A subject is loaded with a single query on the (subject, difficulty)
+index the first time a test for it is started. Drawing a paper of
+``count`` questions to a difficulty mix costs O(count): ``random.sample``
+over each bucket, then one ``in_bulk`` for the picked rows. By contrast,
+``order_by('?')`` sorts the whole subject.
+
+Saving or deleting a question bumps the ``ots_app_questions`` version (see
+ots_app.signals). Each process drops its buckets when it sees that version
+move, and checks at most every VERSION_CHECK_SECONDS (ots_common.versions).
+"""
+import random
+from array import array
+
+from ots_app.models import Question
+from ots_app.versions import VersionedCache
+
+QUESTIONS_VERSION = 'ots_app_questions'
+DIFFICULTIES = ('easy', 'medium', 'hard')
+DEFAULT_MIX = {'easy': 40, 'medium': 40, 'hard': 20}
+
+# subject id -> {difficulty: array of question ids}, filled one subject at a time.
+_buckets = VersionedCache(QUESTIONS_VERSION, lambda version: {})
+
+
+def parse_mix(value) -> dict:
+    """
+    Read a difficulty mix given as {"easy": 40, ...} or "40/40/20"
+    (easy/medium/hard). Raises ValueError when it isn't one.
+    """
+    if isinstance(value, str):
+        parts = value.split('/')
+        if len(parts) != len(DIFFICULTIES):
+            raise ValueError('difficulty mix must look like 40/40/20')
+        value = dict(zip(DIFFICULTIES, parts))
+    if not isinstance(value, dict) or set(value) - set(DIFFICULTIES):
+        raise ValueError(f'difficulty mix keys must be {", ".join(DIFFICULTIES)}')
+    mix = {difficulty: float(value.get(difficulty, 0)) for difficulty in DIFFICULTIES}
+    if any(weight < 0 for weight in mix.values()) or not sum(mix.values()):
+        raise ValueError('difficulty mix weights must be positive')
+    return mix
+
+
+def split_count(count: int, mix: dict) -> dict:
+    """Questions per difficulty for ``count`` questions, by largest remainder."""
+    total = sum(mix.values())
+    exact = {difficulty: count * mix.get(difficulty, 0) / total for difficulty in DIFFICULTIES}
+    split = {difficulty: int(share) for difficulty, share in exact.items()}
+    by_remainder = sorted(DIFFICULTIES, key=lambda d: exact[d] - split[d], reverse=True)
+    for difficulty in by_remainder[:count - sum(split.values())]:
+        split[difficulty] += 1
+    return split
+
+
+def _load_subject(subject_id) -> dict:
+    buckets = {difficulty: array('q') for difficulty in DIFFICULTIES}
+    rows = (Question.objects.filter(subject_id=subject_id).order_by('difficulty', 'id')
+            .values_list('difficulty', 'id'))
+    for difficulty, qid in rows.iterator(chunk_size=10000):
+        buckets.setdefault(difficulty, array('q')).append(qid)
+    return buckets
+
+
+def subject_buckets(subject_id) -> dict:
+    """Return the cached {difficulty: question ids} for a subject."""
+    subjects = _buckets.get()
+    buckets = subjects.get(subject_id)
+    if buckets is None:
+        buckets = subjects.setdefault(subject_id, _load_subject(subject_id))
+    return buckets
+
+
+def invalidate_question_buckets():
+    _buckets.invalidate()
+
+
+def sample_paper(subject_id, count: int, mix=None) -> list:
+    """
+    Pick up to ``count`` distinct questions of a subject in the difficulty
+    ``mix`` (DEFAULT_MIX when None). When a difficulty runs short, the gap is
+    filled from the nearest difficulties that still have questions.
+    """
+    buckets = subject_buckets(subject_id)
+    wanted = split_count(count, mix or DEFAULT_MIX)
+    take = {difficulty: min(wanted[difficulty], len(buckets[difficulty])) for difficulty in DIFFICULTIES}
+    shortfall = count - sum(take.values())
+    for short in sorted(DIFFICULTIES, key=lambda d: wanted[d] - take[d], reverse=True):
+        if shortfall <= 0:
+            break
+        nearest = sorted(DIFFICULTIES, key=lambda d: abs(DIFFICULTIES.index(d) - DIFFICULTIES.index(short)))
+        for difficulty in nearest:
+            extra = min(shortfall, len(buckets[difficulty]) - take[difficulty])
+            take[difficulty] += extra
+            shortfall -= extra
+    picks = []
+    for difficulty in DIFFICULTIES:
+        picks.extend(random.sample(buckets[difficulty], take[difficulty]))
+    random.shuffle(picks)
+    by_id = Question.objects.select_related('subject').in_bulk(picks)
+    return [by_id[qid] for qid in picks if qid in by_id]
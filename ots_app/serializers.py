@@ -51,7 +51,9 @@ class SubjectSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'question_count', 'created_at']
     
     def get_question_count(self, obj):
-        return obj.questions.count()
+        # Annotated by the catalog query; a lone subject (e.g. after create) counts its own.
+        count = getattr(obj, 'question_count', None)
+        return obj.question_set.count() if count is None else count
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ots_app.catalog import CATALOG_VERSION, invalidate_subject_catalog
+from ots_app.delivery import discard_test_delivery
+from ots_app.models import Question, Subject, Test
+from ots_app.sampling import QUESTIONS_VERSION, invalidate_question_buckets
+from ots_app.versions import bump_version
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_bank_changed(sender, **kwargs):
+    bump_version(QUESTIONS_VERSION)
+    invalidate_question_buckets()
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def subject_catalog_changed(sender, **kwargs):
+    bump_version(CATALOG_VERSION)
+    invalidate_subject_catalog()
+
+
+@receiver(post_delete, sender=Test)
+def test_deleted(sender, instance, **kwargs):
+    discard_test_delivery(instance.pk)
@@ -0,0 +1,112 @@
+"""
+Per-student aggregates kept in StudentStats.
+
+``submit_test`` folds each new TestResult into the student's row while
+holding a row lock. The counters are updated with database-side
+expressions; the per-subject, monthly and recent-score JSON are small and
+bounded by the number of subjects and months. Reading the stats is
+therefore one primary-key lookup, however many results a student has. A
+student without a row (e.g. results recorded before the rollup existed)
+is rebuilt from TestResult on first use.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ots_app.catalog import subject_catalog
+from ots_app.models import StudentStats, TestResult, User
+from ots_common.rollups import ScoreRollup, recent_window, running_max
+
+
+def _empty_rollup():
+    return {'scores': ScoreRollup(), 'subjects': {}, 'monthly': {}, 'last_test': None}
+
+
+def _fold(r, subject_id, percentage, created_at):
+    """Add one result to the per-subject and monthly JSON of a rollup."""
+    subject = r['subjects'].setdefault(str(subject_id), {'tests': 0, 'percentage_sum': 0.0, 'best': percentage})
+    subject['tests'] += 1
+    subject['percentage_sum'] += percentage
+    subject['best'] = max(subject['best'], percentage)
+    month = r['monthly'].setdefault(timezone.localtime(created_at).strftime('%Y-%m'), [0, 0.0])
+    month[0] += 1
+    month[1] += percentage
+
+
+def record_result(result: TestResult):
+    """Fold a newly created TestResult into its student's stats row."""
+    with transaction.atomic():
+        stats = StudentStats.objects.select_for_update().filter(student_id=result.student_id).first()
+        if stats is None:
+            rebuild_student_stats(result.student_id)
+            return
+        percentage = float(result.percentage)  # still the int submit_test computed
+        r = {'subjects': stats.subjects, 'monthly': stats.monthly}
+        _fold(r, result.subject_id, percentage, result.created_at)
+        StudentStats.objects.filter(student_id=result.student_id).update(
+            tests_taken=F('tests_taken') + 1,
+            percentage_sum=F('percentage_sum') + percentage,
+            best_percentage=running_max('best_percentage', percentage),
+            subjects=r['subjects'],
+            monthly=r['monthly'],
+            recent_percentages=recent_window(stats.recent_percentages, percentage),
+            last_test=result.created_at,
+        )
+
+
+def rebuild_student_stats(student_id=None) -> int:
+    """Recompute StudentStats from TestResult rows (without loading question_results)."""
+    students = User.objects.all()
+    results = TestResult.objects.order_by('student_id', 'created_at', 'id')
+    if student_id is not None:
+        students = students.filter(pk=student_id)
+        results = results.filter(student_id=student_id)
+
+    rollups = {}
+    rows = results.values_list('student_id', 'subject_id', 'percentage', 'created_at')
+    for sid, subject_id, percentage, created_at in rows.iterator(chunk_size=2000):
+        r = rollups.setdefault(sid, _empty_rollup())
+        r['scores'].add(percentage)
+        r['last_test'] = created_at
+        _fold(r, subject_id, percentage, created_at)
+
+    rebuilt = 0
+    with transaction.atomic():
+        for sid in students.values_list('pk', flat=True).iterator():
+            r = rollups.get(sid) or _empty_rollup()
+            scores = r.pop('scores')
+            StudentStats.objects.update_or_create(student_id=sid, defaults={
+                'tests_taken': scores.count, 'percentage_sum': scores.total, 'best_percentage': scores.best,
+                'recent_percentages': list(scores.recent), **r,
+            })
+            rebuilt += 1
+    return rebuilt
+
+
+def student_stats(student_id) -> StudentStats:
+    stats = StudentStats.objects.filter(student_id=student_id).first()
+    if stats is None:
+        rebuild_student_stats(student_id)
+        stats = StudentStats.objects.filter(student_id=student_id).first() or StudentStats(student_id=student_id)
+    return stats
+
+
+def stats_payload(stats: StudentStats) -> dict:
+    """The get_student_stats response: totals, per-subject breakdown and monthly trend."""
+    names = {str(subject['id']): subject['name'] for subject in subject_catalog().subjects}
+    return {
+        'total_tests': stats.tests_taken,
+        'completed_tests': stats.tests_taken,
+        'average_score': round(stats.average_percentage),
+        'best_score': stats.best_percentage or 0,
+        'subjects': [
+            {'subject_id': int(subject_id), 'subject_name': names.get(subject_id, ''), 'tests': s['tests'],
+             'average_score': round(s['percentage_sum'] / s['tests']), 'best_score': s['best']}
+            for subject_id, s in sorted(stats.subjects.items(), key=lambda item: int(item[0]))
+        ],
+        'trend': [
+            {'month': month, 'tests': tests, 'average_score': round(total / tests)}
+            for month, (tests, total) in sorted(stats.monthly.items())
+        ],
+        'recent_scores': stats.recent_percentages,
+    }
@@ -0,0 +1,18 @@
+"""
+Version counters of ots_app, kept in CacheVersion (see ots_common.versions).
+"""
+from ots_app.models import CacheVersion
+from ots_common import versions
+from ots_common.versions import VERSION_CHECK_SECONDS
+
+COUNTERS = versions.VersionCounters(CacheVersion)
+
+current_version = COUNTERS.current
+bump_version = COUNTERS.bump
+
+
+class VersionedCache(versions.VersionedCache):
+    """A VersionedCache on this app's counters."""
+
+    def __init__(self, name: str, load, check_seconds: float = VERSION_CHECK_SECONDS):
+        super().__init__(COUNTERS, name, load, check_seconds)
@@ -1,24 +1,34 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils.decorators import method_decorator
 from django.utils import timezone
 from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
 from django.contrib import messages
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from pathlib import Path
 import json
 import random
+import time
 
+from ots_common.intents import IntentEngine
+from ots_common.metrics import GRADING_SECONDS, SUBMISSIONS, TESTS_STARTED
+
+from .catalog import subject_catalog
+from .delivery import accepts_gzip, test_delivery
 from .models import User, Subject, Question, Test, TestResult
+from .sampling import parse_mix, sample_paper
+from .stats import record_result, stats_payload, student_stats
 from .serializers import (
     UserSerializer, LoginSerializer, SubjectSerializer, 
-    QuestionSerializer, TestSerializer, TestResultSerializer
+    QuestionSerializer, TestResultSerializer
 )
 
 # Template Views
@@ -62,7 +72,7 @@ def dashboard(request):
     
     context = {
         'user': request.user,
-        'subjects': Subject.objects.all()
+        'subjects': subject_catalog().subjects
     }
     return render(request, 'dashboard/index.html', context)
 
@@ -72,18 +82,19 @@ def admin_dashboard(request):
     if request.user.role != 'admin':
         return redirect('dashboard')
     
+    catalog = subject_catalog()
     context = {
         'user': request.user,
         'total_students': User.objects.filter(role='student').count(),
-        'total_subjects': Subject.objects.count(),
-        'total_questions': Question.objects.count(),
+        'total_subjects': len(catalog.subjects),
+        'total_questions': catalog.total_questions,
     }
     return render(request, 'admin/index.html', context)
 
 @login_required
 def tests_page(request):
     """Tests page"""
-    subjects = Subject.objects.all()
+    subjects = subject_catalog().subjects
     return render(request, 'tests/index.html', {'subjects': subjects})
 
 @login_required
@@ -171,6 +182,10 @@ class SubjectListView(generics.ListCreateAPIView):
             return [permissions.IsAuthenticated()]
         return [permissions.AllowAny()]
 
+    def list(self, request, *args, **kwargs):
+        catalog = subject_catalog()
+        return _catalog_response(request, catalog, lambda: Response(catalog.subjects))
+
 class QuestionListView(generics.ListCreateAPIView):
     """Question list and create view"""
     serializer_class = QuestionSerializer
@@ -188,10 +203,24 @@ def create_test(request):
     """Create a new test"""
     try:
         subject_id = request.data.get('subject_id')
-        question_count = request.data.get('question_count', 15)
+        try:
+            question_count = int(request.data.get('question_count', 15))
+        except (TypeError, ValueError):
+            question_count = 0
+        if question_count < 1:
+            return Response({
+                'error': 'question_count must be a positive integer'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        mix = request.data.get('difficulty_mix')
+        try:
+            mix = parse_mix(mix) if mix is not None else None
+        except (TypeError, ValueError) as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get random questions
-        questions = list(Question.objects.filter(subject_id=subject_id).order_by('?')[:question_count])
+        # Get random questions, e.g. 40% easy, 40% medium, 20% hard
+        questions = sample_paper(subject_id, question_count, mix)
         
         if not questions:
             return Response({
@@ -214,6 +243,7 @@ def create_test(request):
             start_time=timezone.now(),
             status='in-progress'
         )
+        TESTS_STARTED.inc(app='ots_app', source='sampled')
         
         return Response({
             'success': True,
@@ -228,11 +258,30 @@ def create_test(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def get_test(request, test_id):
-    """Get test details"""
+    """Get a test's questions for delivery (no answer keys), optionally one section at a time"""
     try:
-        test = get_object_or_404(Test, id=test_id, student=request.user)
-        serializer = TestSerializer(test)
-        return Response(serializer.data)
+        delivery = test_delivery(test_id)
+        if delivery is None or delivery['student_id'] != request.user.id:
+            return Response({
+                'error': 'Test not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        section = request.query_params.get('section', '0')
+        page = delivery['pages'].get(int(section)) if section.isdigit() else None
+        if page is None:
+            return Response({
+                'error': 'No such section'
+            }, status=status.HTTP_404_NOT_FOUND)
+        gzip = accepts_gzip(request.headers.get('Accept-Encoding', ''))
+        etag = page['gzip_etag'] if gzip else page['etag']
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(page['gzip'] if gzip else page['body'], content_type='application/json')
+            if gzip:
+                response['Content-Encoding'] = 'gzip'
+        response['ETag'] = etag
+        patch_vary_headers(response, ['Accept-Encoding'])
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
     except Exception as e:
         return Response({
             'error': str(e)
@@ -245,6 +294,7 @@ def submit_test(request, test_id):
     try:
         test = get_object_or_404(Test, id=test_id, student=request.user)
         answers = request.data.get('answers', {})
+        grading_started = time.perf_counter()
         
         # Calculate results
         correct_answers = 0
@@ -298,6 +348,9 @@ def submit_test(request, test_id):
             time_taken=time_taken,
             question_results=question_results
         )
+        record_result(test_result)
+        GRADING_SECONDS.observe(time.perf_counter() - grading_started, app='ots_app')
+        SUBMISSIONS.inc(app='ots_app')
         
         return Response({
             'success': True,
@@ -324,14 +377,8 @@ def get_student_stats(request, student_id):
                 'error': 'Permission denied'
             }, status=status.HTTP_403_FORBIDDEN)
         
-        results = TestResult.objects.filter(student_id=student_id)
-        
-        stats = {
-            'total_tests': results.count(),
-            'completed_tests': results.count(),
-            'average_score': round(sum(r.percentage for r in results) / len(results)) if results else 0,
-            'best_score': max(r.percentage for r in results) if results else 0
-        }
+        # One lookup of the rollup that submit_test maintains
+        stats = stats_payload(student_stats(student_id))
         
         return Response(stats)
         
@@ -388,10 +435,11 @@ def admin_stats(request):
         }, status=status.HTTP_403_FORBIDDEN)
     
     try:
+        catalog = subject_catalog()
         stats = {
             'total_students': User.objects.filter(role='student').count(),
-            'total_subjects': Subject.objects.count(),
-            'total_questions': Question.objects.count(),
+            'total_subjects': len(catalog.subjects),
+            'total_questions': catalog.total_questions,
             'total_tests': TestResult.objects.count()
         }
         return Response(stats)
@@ -444,25 +492,27 @@ def admin_student_detail(request, student_id):
         return Response({'success': True})
 
 # Chatbot API
+CHAT_INTENTS = IntentEngine.from_file(Path(__file__).with_name('chat_intents.json'))
+
+CHATBOT_RESPONSES = {
+    'greeting': "Hello! I'm here to help you understand your test results. What would you like to know?",
+    'score': "I can help you understand your test performance. What specific aspect would you like to know about?",
+    'mistakes': "I can explain the questions you got wrong. Would you like me to go through them one by one?",
+    'improve': "To improve your performance, I recommend reviewing the questions you got wrong and practicing similar problems.",
+    None: "I'm here to help! You can ask me about your test scores, wrong answers, or how to improve your performance.",
+}
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def chatbot(request):
     """Simple rule-based chatbot for helping students"""
     try:
-        message = request.data.get('message', '').lower()
+        message = request.data.get('message', '')
         context = request.data.get('context', {})
         
         # Simple responses based on keywords
-        if 'hello' in message or 'hi' in message:
-            response = "Hello! I'm here to help you understand your test results. What would you like to know?"
-        elif 'score' in message or 'percentage' in message:
-            response = "I can help you understand your test performance. What specific aspect would you like to know about?"
-        elif 'wrong' in message or 'mistake' in message:
-            response = "I can explain the questions you got wrong. Would you like me to go through them one by one?"
-        elif 'improve' in message or 'better' in message:
-            response = "To improve your performance, I recommend reviewing the questions you got wrong and practicing similar problems."
-        else:
-            response = "I'm here to help! You can ask me about your test scores, wrong answers, or how to improve your performance."
+        match = CHAT_INTENTS.match(message)
+        response = CHATBOT_RESPONSES.get(match.intent if match else None, CHATBOT_RESPONSES[None])
         
         return Response({'response': response})
         
@@ -524,8 +574,14 @@ def api_logout(request):
     logout(request)
     return JsonResponse({'success': True})
 
+def _catalog_response(request, catalog, build):
+    """304 when the client already holds this catalog version, else build() tagged with it"""
+    response = get_conditional_response(request, etag=catalog.etag) or build()
+    response['ETag'] = catalog.etag
+    patch_cache_control(response, no_cache=True)
+    return response
+
 def api_subjects(request):
-    """Get all subjects"""
-    subjects = Subject.objects.all()
-    data = [{'id': s.id, 'name': s.name, 'description': s.description} for s in subjects]
-    return JsonResponse(data, safe=False)
+    """Get all subjects with their question counts"""
+    catalog = subject_catalog()
+    return _catalog_response(request, catalog, lambda: JsonResponse(catalog.subjects, safe=False))
@@ -0,0 +1,7 @@
+"""
+Helpers shared by the OTS and ots_app apps.
+
+Nothing in this package defines models or imports either app, so each app
+can be installed without the other. Code that depends on an app's models
+(e.g. the table holding its cache versions) is passed in by that app.
+"""
@@ -0,0 +1,65 @@
+"""
+Benchmark helpers that don't depend on either app's models.
+
+Benchmarks run against a throwaway database created the same way the test
+runner does it, so they never touch the real data.
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import override_settings
+
+
+@contextmanager
+def scratch_database(verbosity=0, on_disk=False):
+    """
+    Point the default connection at a fresh, migrated database, with empty
+    process-local caches in place of the configured (possibly shared) ones.
+
+    ``on_disk`` uses a temporary SQLite file instead of shared-cache memory,
+    which is what concurrent writers from several threads need.
+    """
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+    # None is SQLite's shared in-memory database, whatever the tests use.
+    test_settings['NAME'] = os.path.join(tempfile.mkdtemp(prefix='ots-bench-'), 'bench.sqlite3') if on_disk else None
+    caches = {alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'scratch-{alias}'}
+              for alias in settings.CACHES}
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        with override_settings(CACHES=caches):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        test_settings['NAME'] = old_test_name
+
+
+def measure(fn, repeat=20):
+    """Return (median seconds, peak traced bytes) for calling fn()."""
+    fn()  # warm up caches
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    timings.sort()
+    return timings[len(timings) // 2], peak
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
@@ -0,0 +1,87 @@
+"""
+Compiled intent matching for the rule-based chatbot replies.
+
+Rules are plain data (see either app's ``chat_intents.json``): each has an
+``intent`` name and any number of ``keywords`` (whole words or phrases; a
+trailing ``*`` matches any word starting with the prefix) and raw regex
+``patterns``.
+All rules compile into one non-capturing alternation that scans the
+lowercased message once, however many intents exist (write patterns in
+lowercase). Only the few hits are mapped back to their rule; when several
+intents occur, the one listed first in the rules wins, so list specific
+intents (like ``explain_question``) before ones matched by common words.
+
+A rule with ``"args": "numbers"`` also receives every integer that follows
+its match, e.g. ``explain question 1 and 2`` -> ``[1, 2]``.
+"""
+import json
+import re
+
+_NUMBER = re.compile(r'\d+')
+
+
+class IntentMatch:
+    def __init__(self, intent: str, args=None):
+        self.intent = intent
+        self.args = args or []
+
+    def __repr__(self):
+        return f"IntentMatch({self.intent!r}, {self.args!r})"
+
+
+def _keyword_pattern(keyword: str) -> str:
+    prefix = keyword.endswith('*')
+    words = keyword.rstrip('*').lower().split()
+    body = r'\s+'.join(re.escape(w) for w in words)
+    return rf"{body}\w*" if prefix else rf"{body}\b"
+
+
+class IntentEngine:
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._literals = {}
+        self._rule_regexes = []
+        alternatives = []
+        for index, rule in enumerate(self.rules):
+            keywords = rule.get('keywords', [])
+            parts = [_keyword_pattern(k) for k in keywords] + list(rule.get('patterns', []))
+            if not parts:
+                raise ValueError(f"Intent rule {rule.get('intent')!r} has no keywords or patterns")
+            for keyword in keywords:
+                if not keyword.endswith('*'):
+                    self._literals.setdefault(' '.join(keyword.lower().split()), index)
+            alternatives.extend(parts)
+            self._rule_regexes.append(re.compile(r'\b(?:' + '|'.join(parts) + ')'))
+        # Capturing a group per rule makes every scan several times slower,
+        # so the scanner only reports matched text.
+        self._scanner = re.compile(r'\b(?:' + '|'.join(alternatives) + ')')
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding='utf-8') as fh:
+            return cls(json.load(fh))
+
+    def _rule_index(self, hit):
+        """The rule whose own regex produced the scanner ``hit``, or None."""
+        index = self._literals.get(hit.group())
+        if index is None:
+            # Match in place rather than on the hit's text alone, so
+            # lookarounds and word boundaries see the scanner's context.
+            text, start, end = hit.string, hit.start(), hit.end()
+            index = next((i for i, rx in enumerate(self._rule_regexes)
+                          if (found := rx.match(text, start)) and found.end() == end), None)
+        return index
+
+    def match(self, message: str):
+        """Return the highest-priority IntentMatch in ``message``, or None."""
+        lower = message.lower()
+        indexes = [index for index in map(self._rule_index, self._scanner.finditer(lower)) if index is not None]
+        if not indexes:
+            return None
+        best_index = min(indexes)
+        rule = self.rules[best_index]
+        args = []
+        if rule.get('args') == 'numbers':
+            end = self._rule_regexes[best_index].search(lower).end()
+            args = [int(n) for n in _NUMBER.findall(lower, end)]
+        return IntentMatch(rule['intent'], args)
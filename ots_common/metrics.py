@@ -0,0 +1,274 @@
+"""
+In-process metrics (counters, gauges, histograms) served at ``/metrics`` in
+the Prometheus text format.
+
+Updating a metric only touches a dict under a lock. With OTS_METRICS_DIR set,
+each process also writes its values to ``<dir>/<pid>.json``, at most every
+OTS_METRICS_FLUSH_SECONDS and when it exits. ``render`` merges those files
+with its own values:
+
+- counters and histograms are summed over every file, including processes
+  that have exited, so totals survive worker restarts;
+- gauges are summed over processes that are still running.
+
+Empty the directory when the server starts, like Prometheus's own
+multiprocess mode. Without OTS_METRICS_DIR, each process reports only its
+own values.
+
+Gauges registered with ``gauge_function`` are computed when scraped, e.g.
+tests in progress from the exam timers. The metrics both apps record are
+defined here; app-specific ones live in the app (e.g. OTS.metrics).
+"""
+import atexit
+import contextlib
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(names, values, extra='') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, registry, name, documentation, labelnames):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self, values):
+        for key, value in sorted(values.items()):
+            yield f'{self.name}{_labels(self.labelnames, key)} {_number(value)}'
+
+    @staticmethod
+    def merge(total, value):
+        return total + value
+
+    @staticmethod
+    def zero():
+        return 0.0
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+        self.registry.changed()
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = float(value)
+        self.registry.changed()
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+        self.registry.changed()
+
+    def dec(self, amount=1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames, buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self.registry.lock:
+            # Per-bucket counts (the last one is +Inf) followed by the sum.
+            counts = self.values.get(key)
+            if counts is None:
+                counts = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+        self.registry.changed()
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    @staticmethod
+    def merge(total, value):
+        return [a + b for a, b in zip(total, value)]
+
+    def zero(self):
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def samples(self, values):
+        bounds = [_number(bound) for bound in self.buckets] + ['+Inf']
+        for key, counts in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f'{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.labelnames, key)} {_number(counts[-1])}'
+            yield f'{self.name}_count{_labels(self.labelnames, key)} {cumulative}'
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.metrics = {}
+        self.functions = {}
+        self._directory = None
+        self._flush_seconds = 1.0
+        self._next_flush = 0.0
+
+    def _add(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._add(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._add(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(self, name, documentation, labelnames, buckets))
+
+    def gauge_function(self, name, documentation, fn):
+        """Report ``fn()`` as a gauge, computed when scraped in the scraping process."""
+        self.functions[name] = (documentation, fn)
+
+    def _configure(self):
+        if self._directory is None:
+            self._directory = getattr(settings, 'OTS_METRICS_DIR', '') or ''
+            self._flush_seconds = getattr(settings, 'OTS_METRICS_FLUSH_SECONDS', 1.0)
+            if self._directory:
+                os.makedirs(self._directory, exist_ok=True)
+                atexit.register(self.flush)
+        return self._directory
+
+    def changed(self):
+        if time.monotonic() >= self._next_flush:
+            self.flush()
+
+    def _snapshot(self):
+        with self.lock:
+            return {name: [[list(key), list(value) if isinstance(value, list) else value]
+                           for key, value in metric.values.items()]
+                    for name, metric in self.metrics.items() if metric.values}
+
+    def flush(self):
+        """Write this process's values to the shared directory, if there is one."""
+        if not self._flush_lock.acquire(blocking=False):
+            return  # another thread is writing the same file
+        try:
+            self._next_flush = time.monotonic() + self._flush_seconds
+            directory = self._configure()
+            if not directory:
+                return
+            path = os.path.join(directory, f'{os.getpid()}.json')
+            with open(path + '.tmp', 'w') as fh:
+                json.dump(self._snapshot(), fh)
+            os.replace(path + '.tmp', path)
+        except OSError:
+            pass  # metrics must never fail the request; the next flush retries
+        finally:
+            self._flush_lock.release()
+
+    def _collect(self):
+        """Values per metric, merged over every process that wrote them."""
+        merged = {}
+        snapshots = [self._snapshot()]
+        directory = self._configure()
+        if directory:
+            for filename in os.listdir(directory):
+                if not filename.endswith('.json') or filename == f'{os.getpid()}.json':
+                    continue
+                try:
+                    pid = int(filename[:-5])
+                    with open(os.path.join(directory, filename)) as fh:
+                        snapshot = json.load(fh)
+                except (OSError, ValueError):
+                    continue
+                if not _pid_alive(pid):
+                    snapshot = {name: samples for name, samples in snapshot.items()
+                                if name in self.metrics and self.metrics[name].kind != 'gauge'}
+                snapshots.append(snapshot)
+        for snapshot in snapshots:
+            for name, samples in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                values = merged.setdefault(name, {})
+                for key, value in samples:
+                    key = tuple(key)
+                    values[key] = metric.merge(values.get(key, metric.zero()), value)
+        return merged
+
+    def render(self) -> str:
+        merged = self._collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            lines.extend(metric.samples(merged.get(name, {})))
+        for name, (documentation, fn) in self.functions.items():
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {_number(fn())}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+TESTS_STARTED = REGISTRY.counter(
+    'ots_tests_started_total', 'Tests started, by app and where the paper came from', ['app', 'source'])
+SUBMISSIONS = REGISTRY.counter('ots_submissions_total', 'Test papers submitted for grading', ['app'])
+GRADING_SECONDS = REGISTRY.histogram(
+    'ots_grading_seconds', 'Time to grade a submitted paper and store the result', ['app'])
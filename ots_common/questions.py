@@ -0,0 +1,10 @@
+"""
+Question helpers used by both apps' question banks.
+"""
+import hashlib
+
+
+def content_hash(question, a, b, c, d, answer) -> str:
+    """Hash of the normalized content, identical for both question models."""
+    parts = [' '.join(str(value).split()).casefold() for value in (question, a, b, c, d, answer)]
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
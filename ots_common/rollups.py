@@ -0,0 +1,54 @@
+"""
+Running score aggregates shared by the per-candidate (OTS.stats) and
+per-student (ots_app.stats) rollups.
+
+``ScoreRollup`` folds scores in Python when a rollup is rebuilt from the
+stored results. ``running_max`` and ``running_min`` are the matching
+database-side expressions that fold one more score into a stored row
+within an UPDATE, and ``recent_window`` keeps the last RECENT_WINDOW scores.
+"""
+from collections import deque
+
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+
+RECENT_WINDOW = 10
+
+
+class ScoreRollup:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.best = None
+        self.worst = None
+        self.last = None
+        # Consecutive scores that each beat the one before.
+        self.streak = 0
+        self.recent = deque(maxlen=RECENT_WINDOW)
+
+    def add(self, score):
+        self.count += 1
+        self.total += score
+        self.best = score if self.best is None else max(self.best, score)
+        self.worst = score if self.worst is None else min(self.worst, score)
+        self.streak = self.streak + 1 if self.last is not None and score > self.last else 0
+        self.last = score
+        self.recent.append(score)
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else 0.0
+
+
+# SQLite's MAX()/MIN() yield NULL when any argument is NULL, so a column
+# that has no score yet is replaced by the new one first.
+def running_max(field: str, score):
+    return Greatest(Coalesce(F(field), Value(score)), Value(score))
+
+
+def running_min(field: str, score):
+    return Least(Coalesce(F(field), Value(score)), Value(score))
+
+
+def recent_window(scores, score) -> list:
+    return (list(scores) + [score])[-RECENT_WINDOW:]
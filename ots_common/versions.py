@@ -0,0 +1,71 @@
+"""
+Database-stored version counters shared by all worker processes, and the
+process-local caches keyed on them.
+
+Each app keeps its counters in its own table, any model with a ``name``
+primary key and an integer ``version``, wrapped in a ``VersionCounters``.
+A ``VersionedCache`` holds one value per process, built by its loader. The
+process re-reads the version at most every VERSION_CHECK_SECONDS, and
+reloads only when the version has moved, so steady-state reads cost no
+queries. Writers bump the version; ``invalidate`` also drops this process's
+copy at once.
+"""
+import threading
+import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+VERSION_CHECK_SECONDS = 5
+
+_MISSING = object()
+
+
+class VersionCounters:
+    def __init__(self, model):
+        self.model = model
+
+    def current(self, name: str) -> int:
+        version = self.model.objects.filter(name=name).values_list('version', flat=True).first()
+        return version or 0
+
+    def bump(self, name: str):
+        if self.model.objects.filter(name=name).update(version=F('version') + 1):
+            return
+        try:
+            with transaction.atomic():
+                self.model.objects.create(name=name)
+        except IntegrityError:
+            self.model.objects.filter(name=name).update(version=F('version') + 1)
+
+
+class VersionedCache:
+    """``get()`` returns ``load(version)``, rebuilt when the named version moves."""
+
+    def __init__(self, counters: VersionCounters, name: str, load, check_seconds: float = VERSION_CHECK_SECONDS):
+        self.counters = counters
+        self.name = name
+        self.load = load
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._value = _MISSING
+        self._version = None
+        self._checked_at = 0.0
+
+    def get(self):
+        value = self._value
+        if value is not _MISSING and time.monotonic() - self._checked_at < self.check_seconds:
+            return value
+        with self._lock:
+            if self._value is _MISSING or time.monotonic() - self._checked_at >= self.check_seconds:
+                # Read the version first: a value loaded after it is at least as new.
+                version = self.counters.current(self.name)
+                if self._value is _MISSING or version != self._version:
+                    self._value = self.load(version)
+                    self._version = version
+                self._checked_at = time.monotonic()
+            return self._value
+
+    def invalidate(self):
+        with self._lock:
+            self._value = _MISSING
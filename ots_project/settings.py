@@ -22,8 +22,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'OTS.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'OTS.middleware.SessionRefreshMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -33,9 +35,11 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'ots_project.urls'
 
+# The stock Django backend, also timing renders for Server-Timing (see
+# OTS/request_metrics.py).
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'OTS.request_metrics.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -49,15 +53,41 @@ TEMPLATES = [
     },
 ]
 
+# Django 4.2 wraps the loaders above in the cached loader (with or without
+# DEBUG), so compiled templates are reused across requests. Keep
+# django.template.loaders.cached.Loader if 'loaders' is ever set explicitly.
+
 WSGI_APPLICATION = 'ots_project.wsgi.application'
 
+# The test database lives on disk: OTS.tests submits from several threads,
+# which SQLite's shared in-memory database answers with "table is locked".
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
+# Running exam timers and autosaved answers (OTS.exam_timer, OTS.autosave)
+# live in the default cache, so every worker process must share it. Files
+# under cache/ serve the processes of one host; across hosts, set e.g.
+# OTS_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and
+# OTS_CACHE_LOCATION=redis://host:6379.
+# {% cache %} fragments (test paper questions, history rows) use their own
+# alias so a large question bank doesn't evict other cached data.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('OTS_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('OTS_CACHE_LOCATION', str(BASE_DIR / 'cache')),
+    },
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'template-fragments',
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -76,7 +106,10 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 SESSION_COOKIE_AGE = 3600
-SESSION_SAVE_EVERY_REQUEST = True
+# Sessions are saved only when they change. SessionRefreshMiddleware extends
+# a logged-in session at most this often, so it still expires an hour after
+# the last activity. Exam timers live in OTS.exam_timer.
+OTS_SESSION_REFRESH_SECONDS = 300
 
 # OpenAI API key
 # Preferred: set OPENAI_API_KEY as an environment variable on your machine (do not hardcode secrets) [^4][^5]
@@ -84,3 +117,77 @@ OPENAI_API_KEY = ""
 
 # For quick local testing only, you MAY paste your key here instead of using env vars:
 # OPENAI_API_KEY = "sk-REPLACE_WITH_YOUR_KEY"
+
+# Test assistant LLM provider: '' uses OpenAI when a key is set (rule-based
+# replies otherwise); 'fake' streams canned replies locally for offline
+# benchmarking. The streaming endpoint needs an ASGI server (ots_project.asgi).
+OTS_CHAT_PROVIDER = os.getenv('OTS_CHAT_PROVIDER', '')
+OTS_FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv('OTS_FAKE_LLM_TOKENS_PER_SECOND', '40'))
+OTS_FAKE_LLM_FIRST_TOKEN_MS = float(os.getenv('OTS_FAKE_LLM_FIRST_TOKEN_MS', '300'))
+
+# Chatbot reply cache (per process): max entries and lifetime in seconds.
+OTS_CHAT_CACHE_SIZE = 1024
+OTS_CHAT_CACHE_TTL = 3600
+
+# Rule-based chatbot intents (see ots_common/intents.py for the format).
+OTS_CHAT_INTENTS_FILE = BASE_DIR / 'OTS' / 'chat_intents.json'
+
+# Pre-built paper pool (see OTS/paper_pool.py): lengths build_paper_pool fills
+# by default, papers kept per length, and the level that triggers a refill.
+OTS_PAPER_POOL_LENGTHS = (3, 5, 10)
+OTS_PAPER_POOL_TARGET = 300
+OTS_PAPER_POOL_LOW_WATER = 100
+
+# Autosave (OTS/autosave.py) writes a running test's answers to the database
+# once OTS_AUTOSAVE_FLUSH_CHANGES changes have piled up, on the first change
+# OTS_AUTOSAVE_FLUSH_SECONDS after the last write, and on every change in the
+# test's last OTS_AUTOSAVE_FLUSH_SECONDS.
+OTS_AUTOSAVE_FLUSH_CHANGES = 10
+OTS_AUTOSAVE_FLUSH_SECONDS = 15
+
+# ots_app get_test delivers long tests a section of this many questions at a
+# time when asked for ?section=N (see ots_app/delivery.py).
+OTS_TEST_SECTION_SIZE = 10
+
+# Per-request metrics (OTS.middleware.RequestTimingMiddleware): send a
+# Server-Timing header, and log views that run more queries than their
+# budget, keyed by URL name. OTS_QUERY_BUDGET_STRICT raises instead of
+# logging; turn it on in tests. Set OTS_REQUEST_LOG_LEVEL=INFO to log every
+# request as a JSON line.
+OTS_SERVER_TIMING = True
+OTS_QUERY_BUDGETS = {
+    'OTS:login': 6,
+    'OTS:home': 10,
+    'OTS:testPaper': 12,
+    'OTS:apiAutosave': 5,
+    'OTS:calculateTest': 17,
+    'OTS:result': 5,
+    'OTS:testHistory': 7,
+    'OTS:apiTestHistory': 5,
+    'OTS:testDetail': 7,
+    'OTS:chatbot': 5,
+    'OTS:apiChat': 7,
+    'OTS:apiChatStream': 7,
+}
+OTS_QUERY_BUDGET_STRICT = False
+
+# Metrics served at /metrics (see ots_common/metrics.py). With a directory set,
+# every worker process writes its values there so any worker can report
+# totals for all of them; empty it when the server starts.
+OTS_METRICS_DIR = os.getenv('OTS_METRICS_DIR', '')
+OTS_METRICS_FLUSH_SECONDS = 1.0
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'OTS.requests': {
+            'handlers': ['console'],
+            'level': os.getenv('OTS_REQUEST_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}